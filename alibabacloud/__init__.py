@@ -12,15 +12,53 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from aliyunsdkcore.acs_exception.exceptions import ClientException
-from aliyunsdkcore.client import AcsClient
-from alibabacloud.services.ecs import ECSResource
+from alibabacloud.clients import get_default_registry
+from alibabacloud.services import get_service_class
 import alibabacloud.errors
 
 
-def get_resource(service_name, access_key_id=None, access_key_secret=None, region_id=None):
-    if service_name.lower() == "ecs":
-        client = AcsClient(access_key_id, access_key_secret, region_id)
-        return ECSResource(client)
-    else:
+def _get_service_class(service_name, kind):
+    # service modules are imported here, on first use, not with alibabacloud
+    resource_class = get_service_class(service_name, kind)
+    if resource_class is None:
         raise ClientException(alibabacloud.errors.ERROR_CODE_SERVICE_NOT_SUPPORTED,
                               "Service '{0}' is not currently supported.".format(service_name))
+    return resource_class
+
+
+def _get_client_options(options):
+    # the AcsClient retries on its own by default, under a RetryPolicy its
+    # attempts would multiply and go unseen by the observers
+    if options.get('retry_policy') is not None:
+        return {'auto_retry': False}
+    return {}
+
+
+def get_resource(service_name, access_key_id=None, access_key_secret=None, region_id=None,
+                 regions=None, client_registry=None, **options):
+    # with regions, the resource spans all of them instead of region_id.
+    # Clients come from client_registry, by default the process-wide one,
+    # so repeated calls reuse their warm connections.
+    client_registry = client_registry or get_default_registry()
+    client_options = _get_client_options(options)
+    if regions is not None:
+        resource_class = _get_service_class(service_name, 'multi_region')
+        clients = [client_registry.get_client(access_key_id, access_key_secret, region,
+                                              **client_options)
+                   for region in regions]
+        return resource_class(clients, **options)
+    resource_class = _get_service_class(service_name, 'resource')
+    client = client_registry.get_client(access_key_id, access_key_secret, region_id,
+                                        **client_options)
+    return resource_class(client, **options)
+
+
+def get_async_resource(service_name, access_key_id=None, access_key_secret=None, region_id=None,
+                       executor=None, client_registry=None, **options):
+    # asyncio support needs Python 3.6+, which the async modules are only
+    # imported on demand for as well
+    client_registry = client_registry or get_default_registry()
+    resource_class = _get_service_class(service_name, 'async')
+    client = client_registry.get_client(access_key_id, access_key_secret, region_id,
+                                        **_get_client_options(options))
+    return resource_class(client, executor=executor, **options)
@@ -0,0 +1,102 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from collections import OrderedDict
+
+from aliyunsdkcore.vendored.six import iteritems
+
+# keep-alive connections per client: enough for the default page
+# concurrency and bulk action workers of several resources sharing it
+DEFAULT_POOL_SIZE = 32
+
+
+class ClientRegistry(object):
+    """Hands out one shared client per credentials and region.
+
+    An AcsClient keeps a pool of up to pool_size keep-alive connections, so
+    reusing it saves the connection setup and TLS handshake of every new
+    client. Clients are created on first use and then shared by all the
+    callers with the same access key, secret, region and client options.
+    With max_clients, the least recently used client is dropped from the
+    registry when a new one would exceed it; whoever still holds it can keep
+    using it. The registry is thread-safe.
+
+    client_factory defaults to AcsClient, imported on the first get_client().
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_clients=None, client_factory=None):
+        self.pool_size = pool_size
+        self.max_clients = max_clients
+        self._client_factory = client_factory
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self):
+        return len(self._clients)
+
+    @staticmethod
+    def _make_key(access_key_id, access_key_secret, region_id, client_options):
+        return (access_key_id, access_key_secret, region_id,
+                tuple(sorted(iteritems(client_options))))
+
+    def get_client(self, access_key_id=None, access_key_secret=None, region_id=None,
+                   **client_options):
+        """Return the client of these credentials and region, creating it
+        if needed. client_options are passed on to the client factory.
+        """
+        key = self._make_key(access_key_id, access_key_secret, region_id, client_options)
+        with self._lock:
+            client = self._clients.pop(key, None)
+            if client is not None:
+                self.reused += 1
+            else:
+                client_options.setdefault('pool_size', self.pool_size)
+                if self._client_factory is None:
+                    # importing the HTTP stack is a large part of the import time
+                    from aliyunsdkcore.client import AcsClient
+                    self._client_factory = AcsClient
+                client = self._client_factory(access_key_id, access_key_secret, region_id,
+                                              **client_options)
+                self.created += 1
+                if self.max_clients is not None and len(self._clients) >= self.max_clients:
+                    self._clients.popitem(last=False)
+            # the most recently used clients are kept at the end
+            self._clients[key] = client
+            return client
+
+    def clear(self):
+        """Forget every client, closing their idle connections."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            session = getattr(client, 'session', None)
+            if session is not None:
+                session.close()
+
+
+_default_registry = ClientRegistry()
+
+
+def get_default_registry():
+    """Return the process-wide registry used by alibabacloud.get_resource."""
+    return _default_registry
+
+
+def get_client(access_key_id=None, access_key_secret=None, region_id=None, **client_options):
+    """Return a shared client from the process-wide registry."""
+    return _default_registry.get_client(access_key_id, access_key_secret, region_id,
+                                        **client_options)
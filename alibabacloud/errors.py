@@ -15,3 +15,4 @@
 
 ERROR_CODE_SERVICE_NOT_SUPPORTED = "SDK.ServiceNotSupported"
 ERROR_INVALID_SERVER_RESPONSE = "SDK.InvalidServerResponse"
+ERROR_CODE_REPLAY_NOT_FOUND = "SDK.ReplayNotFound"
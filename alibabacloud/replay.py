@@ -0,0 +1,183 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Record the traffic of a client once, then replay it offline.
+
+    client = RecordingClient(AcsClient(...), 'traffic.jsonl')
+    list(ECSResource(client).instances.all())
+    client.close()
+
+    ecs = ECSResource(ReplayClient('traffic.jsonl', speed=None))
+
+Requests are matched on their action and parameters. Each match serves the
+next recorded response of that request, and the last one once they run out,
+so polling loops replay the status changes they saw.
+"""
+import json
+import threading
+import time
+from collections import deque
+
+from aliyunsdkcore.acs_exception.exceptions import ClientException, ServerException
+from aliyunsdkcore.vendored.six import iteritems, string_types
+
+import alibabacloud.errors as errors
+
+# parameters that differ on every call of the same request
+DEFAULT_IGNORED_PARAMS = ('ClientToken',)
+
+
+def _get_params(request, ignored_params):
+    params = {}
+    for source in (request.get_query_params(), request.get_body_params()):
+        for key, value in iteritems(source or {}):
+            if key not in ignored_params:
+                params[key] = value if isinstance(value, string_types) else json.dumps(value)
+    return params
+
+
+def _make_key(action_name, params):
+    return action_name, json.dumps(params, sort_keys=True)
+
+
+def _dump_error(error):
+    record = {'code': error.get_error_code(), 'message': error.get_error_msg()}
+    if isinstance(error, ServerException):
+        record['type'] = 'server'
+        record['http_status'] = error.get_http_status()
+        record['request_id'] = error.get_request_id()
+    else:
+        record['type'] = 'client'
+    return record
+
+
+def _load_error(record):
+    if record['type'] == 'server':
+        return ServerException(record['code'], record['message'], record['http_status'],
+                               record['request_id'])
+    return ClientException(record['code'], record['message'])
+
+
+def load_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RecordingClient(object):
+    """Wraps a client and records every request it sends.
+
+    Records are kept in `records`, and also written to path as JSON lines
+    when it is given. Every other attribute comes from the wrapped client.
+    """
+
+    def __init__(self, client, path=None, ignored_params=DEFAULT_IGNORED_PARAMS):
+        self._client = client
+        self._ignored_params = frozenset(ignored_params)
+        self._file = open(path, 'w') if path else None
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+        self.records = []
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def get_region_id(self):
+        return self._client.get_region_id()
+
+    def do_action_with_exception(self, request):
+        record = {
+            'action': request.get_action_name(),
+            'params': _get_params(request, self._ignored_params),
+            'region_id': self._client.get_region_id(),
+            'time': time.time() - self._start_time,
+        }
+        start_time = time.time()
+        try:
+            response = self._client.do_action_with_exception(request)
+        except (ClientException, ServerException) as e:
+            record['latency'] = time.time() - start_time
+            record['error'] = _dump_error(e)
+            self._add(record)
+            raise
+        record['latency'] = time.time() - start_time
+        record['response'] = response.decode('utf-8') if isinstance(response, bytes) \
+            else response
+        self._add(record)
+        return response
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record) + '\n')
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ReplayClient(object):
+    """Serves recorded responses in place of a client.
+
+    :param records: the path of a recording, or a list of records
+    :param speed: None to answer at once; otherwise every response waits its
+        recorded latency divided by speed, e.g. 1 for the original timing
+    :param region_id: the region the client claims to be in, by default the
+        one of the first record
+    """
+
+    def __init__(self, records, speed=None, region_id=None,
+                 ignored_params=DEFAULT_IGNORED_PARAMS):
+        if not isinstance(records, list):
+            records = load_records(records)
+        self._speed = speed
+        self._ignored_params = frozenset(ignored_params)
+        self._region_id = region_id or (records[0]['region_id'] if records else None)
+        self._responses = {}
+        self._lock = threading.Lock()
+        for record in records:
+            key = _make_key(record['action'], record['params'])
+            self._responses.setdefault(key, deque()).append(record)
+        self.misses = 0
+
+    def get_region_id(self):
+        return self._region_id
+
+    def _next_record(self, request):
+        key = _make_key(request.get_action_name(),
+                        _get_params(request, self._ignored_params))
+        with self._lock:
+            records = self._responses.get(key)
+            if not records:
+                self.misses += 1
+                raise ClientException(
+                    errors.ERROR_CODE_REPLAY_NOT_FOUND,
+                    "No recorded response for {0} with {1}.".format(key[0], key[1]))
+            # keep serving the last response once the others are used up
+            return records.popleft() if len(records) > 1 else records[0]
+
+    def do_action_with_exception(self, request):
+        record = self._next_record(request)
+        if self._speed:
+            time.sleep(record['latency'] / self._speed)
+        if 'error' in record:
+            raise _load_error(record['error'])
+        return record['response'].encode('utf-8')
@@ -0,0 +1,61 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from alibabacloud.clients import DEFAULT_POOL_SIZE
+from alibabacloud.resources.base import ServiceResource
+
+# as many threads as a registry client has keep-alive connections, more
+# would only queue on the connection pool
+DEFAULT_MAX_WORKERS = DEFAULT_POOL_SIZE
+
+
+class AsyncServiceResource(ServiceResource):
+    """A ServiceResource whose requests are awaitable.
+
+    The blocking client call runs on `executor`, so coroutines only hold a
+    thread while a request is actually on the wire. When None, the resource
+    makes its own executor of DEFAULT_MAX_WORKERS threads on first use,
+    which caps how many of its requests are in flight at once; pass an
+    executor sized like the pool_size of the client to change that.
+    """
+
+    # Subclasses keep _executor in their own slot, or in their __dict__ when
+    # they have one: a slot here would clash with those of ECSInstanceResource,
+    # which AsyncECSInstanceResource also derives from.
+    __slots__ = ()
+
+    def __init__(self, service_name, client=None, executor=None, **options):
+        ServiceResource.__init__(self, service_name, client=client, **options)
+        self._executor = executor
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS)
+        return self._executor
+
+    async def _do_request(self, request, params):
+        # get_running_loop() needs Python 3.7; in a coroutine, this returns
+        # the running loop as well
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            functools.partial(ServiceResource._do_request, self, request, params),
+        )
+
+    async def _get_respone(self, request, params, key=None, keys=None):
+        response = await self._do_request(request, params)
+        return self._extract_response(response, key=key, keys=keys)
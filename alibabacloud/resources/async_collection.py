@@ -0,0 +1,178 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import copy
+import time
+from collections import deque
+
+from alibabacloud.resources.collection import BulkActionReport, ResourceCollection
+
+
+def _retry_page_handler(page_handler, retries, delay):
+    async def get_page(params):
+        for attempt in range(retries + 1):
+            try:
+                # the page handler may consume its parameters
+                return await page_handler(copy.deepcopy(params))
+            except Exception:
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(delay * 2 ** attempt)
+    return get_page
+
+
+class AsyncResourceCollection(ResourceCollection):
+    """A ResourceCollection to iterate with `async for`.
+
+    The page handler must be a coroutine function. Pages after the first one
+    are fetched as concurrent tasks, at most `concurrency` at a time.
+    """
+
+    def __iter__(self):
+        raise TypeError("'{0}' must be iterated with 'async for'.".format(
+            self.__class__.__name__))
+
+    async def __aiter__(self):
+        async for page in self.pages():
+            for item in page:
+                yield item
+
+    async def raw(self):
+        async for page in self.pages(raw=True):
+            for item in page:
+                yield item
+
+    async def to_columns(self, fields, numpy=False):
+        builder = self._get_column_builder(fields)
+        async for page in self.pages(raw=True):
+            builder.add_items(page)
+        return builder.build(numpy=numpy)
+
+    async def count(self):
+        if self._predicates:
+            count = 0
+            async for page in self.pages(raw=True):
+                count += len(page)
+            return count
+        return self._get_limit((await self._get_page(1, 1))[0])
+
+    async def exists(self):
+        if self._predicates:
+            async for page in self.limit(1).pages(raw=True):
+                if page:
+                    return True
+            return False
+        return (await self._get_page(1, 1))[0] > 0
+
+    async def _get_page_items(self, page_nums, page_size):
+        page_nums = iter(page_nums)
+        tasks = deque()
+        window = self._get_prefetch_window()
+
+        def schedule_next():
+            page_num = next(page_nums, None)
+            if page_num is not None:
+                tasks.append(asyncio.ensure_future(self._get_page(page_num, page_size)))
+            return page_num is not None
+
+        try:
+            for _ in range(window):
+                schedule_next()
+            while tasks:
+                items = (await tasks.popleft())[3]
+                if window == self._concurrency:
+                    schedule_next()
+                    yield items
+                    continue
+                yield items
+                window = min(window * 2, self._concurrency)
+                while len(tasks) < window and schedule_next():
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def pages(self, raw=False):
+
+        # the first page tells us the total count and the page size in use
+        total_count, page_size, page_num, items = await self._get_page(1, self._get_page_size())
+        limit = self._get_limit(total_count)
+        page_items = self._get_page_items(
+            self._get_remaining_page_nums(total_count, limit, page_size), page_size)
+
+        make_page = self._get_items if raw else self._create_resources
+        count = 0
+        try:
+            while True:
+                page = make_page(items, limit - count)
+                count += len(page)
+                yield page
+                if count >= limit or not items:
+                    break
+                try:
+                    items = await page_items.__anext__()
+                except StopAsyncIteration:
+                    break
+        finally:
+            await page_items.aclose()
+
+    async def scan(self, cursor=None, raw=False, page_retries=3, retry_delay=1):
+        """See ResourceCollection.scan()."""
+        cursor = self._get_scan_cursor(cursor)
+        if cursor.done:
+            return
+
+        collection = self._clone()
+        collection._page_handler = _retry_page_handler(self._page_handler, page_retries,
+                                                       retry_delay)
+        total_count, page_size, page_num, items = await collection._get_page(
+            cursor.next_page, cursor.page_size or self._get_page_size())
+        cursor.page_size = cursor.page_size or page_size
+        limit = self._get_limit(total_count)
+        page_items = collection._get_page_items(
+            self._get_remaining_page_nums(total_count, limit, page_size, cursor.next_page),
+            page_size)
+
+        make_page = self._get_items if raw else self._create_resources
+        try:
+            while True:
+                page = make_page(items, limit - cursor.items_seen)
+                cursor._advance(page, items, limit)
+                yield page
+                if cursor.done:
+                    break
+                try:
+                    items = await page_items.__anext__()
+                except StopAsyncIteration:
+                    cursor.done = True
+                    break
+        finally:
+            await page_items.aclose()
+
+    async def _do_bulk_action(self, action_name, max_workers=None):
+        semaphore = asyncio.Semaphore(max_workers or self._concurrency)
+
+        async def run_action(resource):
+            async with semaphore:
+                start_time = time.time()
+                try:
+                    await getattr(resource, action_name)()
+                    error = None
+                except Exception as e:
+                    error = e
+                return resource, error, time.time() - start_time
+
+        resources = [resource async for resource in self]
+        results = await asyncio.gather(*[run_action(resource) for resource in resources])
+        return BulkActionReport(action_name, list(results))
@@ -11,24 +11,115 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import json
+import functools
+import time
 import alibabacloud.errors as errors
 from aliyunsdkcore.acs_exception.exceptions import ClientException
+from alibabacloud.resources import decoder
+from alibabacloud.resources.cache import make_request_key
 
 
 class ServiceResource(object):
 
-    def __init__(self, service_name, client=None):
+    __slots__ = ('service_name', '_client', '_cache', '_single_flight', '_rate_limiter',
+                 '_retry_policy', '_observers')
+
+    def __init__(self, service_name, client=None, cache=None, single_flight=None,
+                 rate_limiter=None, retry_policy=None, observers=None):
         self.service_name = service_name
         self._client = client
+        self._cache = cache
+        self._single_flight = single_flight
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        # the list is shared with the resources this resource creates
+        self._observers = observers if observers is not None else []
+
+    def _get_options(self):
+        # the options shared with the resources this resource creates
+        return {
+            'cache': self._cache,
+            'single_flight': self._single_flight,
+            'rate_limiter': self._rate_limiter,
+            'retry_policy': self._retry_policy,
+            'observers': self._observers,
+        }
+
+    def add_observer(self, observer):
+        """Register a RequestObserver, see alibabacloud.resources.metrics.
+
+        The observer also sees the requests of the resources this resource
+        has created or creates, e.g. the instances of an ECSResource.
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
 
     def _do_request(self, request, params):
         for key, value in params.items():
             if hasattr(request, 'set_'+key):
                 func = getattr(request, 'set_' + key)
                 func(value)
-        response = self._client.do_action_with_exception(request)
-        return json.loads(response.decode('utf-8'))
+        response = self._send_request(request)
+        return decoder.decode(response)
+
+    def _send_request(self, request):
+        cache = self._cache
+        if cache is None:
+            return self._send_coalesced_request(request)
+
+        if not cache.is_read_only(request):
+            try:
+                return self._send_coalesced_request(request)
+            finally:
+                cache.invalidate(request)
+
+        key = make_request_key(self._client.get_region_id(), request, self._client)
+        response = cache.get(key)
+        if response is None:
+            generation = cache.generation
+            response = self._send_coalesced_request(request)
+            cache.put(key, request, response, generation)
+        return response
+
+    def _send_coalesced_request(self, request):
+        single_flight = self._single_flight
+        if single_flight is None or not single_flight.is_read_only(request):
+            return self._call_client(request)
+
+        key = make_request_key(self._client.get_region_id(), request, self._client)
+        return single_flight.do(key, functools.partial(self._call_client, request))
+
+    def _call_client(self, request):
+        rate_limiter = self._rate_limiter
+        retry_policy = self._retry_policy
+        retries = 0
+        delays = None
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire(request.get_action_name())
+            observers = self._observers
+            for observer in observers:
+                observer.before_request(request)
+            start_time = time.time()
+            try:
+                response = self._client.do_action_with_exception(request)
+            except Exception as e:
+                will_retry = retry_policy is not None and retry_policy.should_retry(
+                    request, e, retries)
+                for observer in observers:
+                    observer.on_error(request, e, time.time() - start_time, will_retry)
+                if not will_retry:
+                    raise
+            else:
+                for observer in observers:
+                    observer.after_response(request, response, time.time() - start_time)
+                return response
+            if delays is None:
+                delays = retry_policy.delays()
+            time.sleep(next(delays))
+            retries += 1
 
     @staticmethod
     def _check_server_response(obj, key):
@@ -40,12 +131,16 @@ class ServiceResource(object):
 
     def _get_respone(self, request, params, key=None, keys=None):
         response = self._do_request(request, params)
+        return self._extract_response(response, key=key, keys=keys)
+
+    @classmethod
+    def _extract_response(cls, response, key=None, keys=None):
         if key:
-            self._check_server_response(response, key)
+            cls._check_server_response(response, key)
             return response[key]
         if keys:
             obj = response
             for key in keys:
-                self._check_server_response(obj, key)
+                cls._check_server_response(obj, key)
                 obj = obj[key]
             return obj
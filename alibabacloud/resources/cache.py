@@ -0,0 +1,180 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from aliyunsdkcore.vendored.six import iteritems, string_types
+
+
+def _get_client_identity(client):
+    # the same request answers differently for every account, so keys hold
+    # the access key id, or the client itself when it has none
+    get_access_key = getattr(client, 'get_access_key', None)
+    access_key_id = get_access_key() if get_access_key is not None else None
+    return access_key_id if access_key_id is not None else id(client)
+
+
+def make_request_key(region_id, request, client=None):
+    params = tuple(sorted((key, str(value)) for key, value in
+                          iteritems(request.get_query_params())))
+    return (_get_client_identity(client) if client is not None else None, region_id,
+            request.get_product(), request.get_action_name(), params)
+
+
+class ResponseCache(object):
+    """A TTL and LRU bounded cache for the responses of read-only actions.
+
+    Responses are cached as the raw bytes returned by the client, keyed on the
+    account of the client, the region, the action and its parameters, so
+    resources of several accounts can share one cache. Entries expire `ttl`
+    seconds after they were stored and the least recently used entry is
+    evicted once there are more than `max_size` of them.
+
+    Every other action invalidates the entries that mention one of the ids
+    in its `id_params` parameters, as well as all entries that were not
+    restricted to some ids, since a listing may include any resource.
+
+    A read that was sent before an invalidation may bring back what the
+    invalidation removed, so callers take the `generation` before sending
+    and pass it to put(), which drops the response if anything was
+    invalidated in between.
+    """
+
+    def __init__(self, ttl=5, max_size=1024, read_only_prefixes=('Describe',),
+                 id_params=('InstanceId', 'InstanceIds')):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.read_only_prefixes = tuple(read_only_prefixes)
+        self.id_params = tuple(id_params)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (expire time, ids or None, body)
+        self._lock = threading.Lock()
+
+    def is_read_only(self, request):
+        return request.get_action_name().startswith(self.read_only_prefixes)
+
+    def _get_ids(self, request):
+        ids = set()
+        params = request.get_query_params()
+        for name in self.id_params:
+            value = params.get(name)
+            if value is None:
+                continue
+            if isinstance(value, string_types) and value.startswith('['):
+                ids.update(json.loads(value))
+            elif isinstance(value, (list, tuple)):
+                ids.update(value)
+            else:
+                ids.add(value)
+        return ids
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries[key] = self._entries.pop(key)  # most recently used
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+
+    def put(self, key, request, body, generation=None):
+        ids = self._get_ids(request) or None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, ids, body)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, request):
+        ids = self._get_ids(request)
+        with self._lock:
+            self.generation += 1
+            for key, (expire_time, entry_ids, body) in list(self._entries.items()):
+                if entry_ids is None or entry_ids & ids:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+            }
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Lets concurrent identical read-only requests share one response.
+
+    While a request is in flight, callers that send an identical one wait for
+    it and get the same response, or the same exception. `shared` counts the
+    requests that were saved that way.
+    """
+
+    def __init__(self, read_only_prefixes=('Describe',)):
+        self.read_only_prefixes = tuple(read_only_prefixes)
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def is_read_only(self, request):
+        return request.get_action_name().startswith(self.read_only_prefixes)
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.response
+
+        try:
+            call.response = func()
+            return call.response
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
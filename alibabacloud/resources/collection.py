@@ -12,78 +12,576 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import copy
+import json
+import math
+import operator
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from aliyunsdkcore.vendored.six import integer_types, string_types
+
+DEFAULT_CONCURRENCY = 8
+
+
+class BulkActionReport(object):
+    """The outcome of running one action on every resource of a collection.
+
+    `results` holds a (resource, exception or None, seconds) tuple per
+    resource, in the order of the collection.
+    """
+
+    def __init__(self, action_name, results=None):
+        self.action_name = action_name
+        self.results = results or []
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def succeeded(self):
+        return [resource for resource, error, latency in self.results if error is None]
+
+    @property
+    def failed(self):
+        return [(resource, error) for resource, error, latency in self.results
+                if error is not None]
+
+    @property
+    def latencies(self):
+        return [latency for resource, error, latency in self.results]
+
+
+def _run_action(resource, action_name):
+    start_time = time.time()
+    try:
+        getattr(resource, action_name)()
+        error = None
+    except Exception as e:
+        error = e
+    return resource, error, time.time() - start_time
+
+
+def _run_bulk_action(resources, action_name, max_workers):
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(_run_action, resource, action_name)
+                   for resource in resources]
+        return BulkActionReport(action_name, [future.result() for future in futures])
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _get_int_typecode():
+    # Python 2 has no 'q', its 'l' is 32 bits on some platforms
+    try:
+        array('q')
+        return 'q'
+    except ValueError:
+        return 'l'
+
+
+_INT_TYPECODE = _get_int_typecode()
+
+
+class _Column(object):
+    # A column is an array while all its values fit one typecode: 'q' (or
+    # 'l') for integers, 'd' for floats. Otherwise, or from the first None,
+    # value of another type or integer out of range on, it is a list. Equal
+    # strings share one object, unicode ones on Python 2 as well.
+
+    def __init__(self):
+        self.values = None
+        self._strings = {}
+
+    @staticmethod
+    def _get_typecode(value):
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, integer_types):
+            return _INT_TYPECODE
+        if isinstance(value, float):
+            return 'd'
+
+    def append(self, value):
+        values = self.values
+        if values is None:
+            typecode = self._get_typecode(value)
+            values = self.values = array(typecode) if typecode else []
+        elif isinstance(values, array) and self._get_typecode(value) != values.typecode:
+            values = self.values = values.tolist()
+        if isinstance(value, string_types):
+            value = self._strings.setdefault(value, value)
+        try:
+            values.append(value)
+        except OverflowError:
+            values = self.values = values.tolist()
+            values.append(value)
+
+
+class _ColumnBuilder(object):
+
+    def __init__(self, fields, keys):
+        self._fields = fields
+        self._keys = keys
+        self._columns = [_Column() for field in fields]
+
+    def add_items(self, items):
+        for column, key in zip(self._columns, self._keys):
+            for item in items:
+                column.append(item.get(key))
+
+    def build(self, numpy=False):
+        columns = {}
+        for field, column in zip(self._fields, self._columns):
+            values = column.values if column.values is not None else []
+            if numpy:
+                values = _get_numpy().asarray(values)
+            columns[field] = values
+        return columns
+
+
+def _get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy is required for to_columns(numpy=True).")
+    return numpy
+
+
+def _is_in(value, values):
+    return value in values
+
+
+def _contains(value, element):
+    return value is not None and element in value
+
+
+def _startswith(value, prefix):
+    return value is not None and value.startswith(prefix)
+
+
+# the lookups of client-side filters, e.g. filter(cpu__gte=4)
+LOOKUPS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'in': _is_in,
+    'contains': _contains,
+    'startswith': _startswith,
+}
+_ORDERING_LOOKUPS = frozenset(['lt', 'lte', 'gt', 'gte'])
+
+
+class _Predicate(object):
+
+    def __init__(self, key, lookup, value):
+        self.key = key
+        self.lookup = lookup
+        self.value = value
+
+    def __call__(self, item):
+        value = item.get(self.key)
+        if callable(self.value):
+            return bool(self.value(value))
+        if value is None and self.lookup in _ORDERING_LOOKUPS:
+            return False
+        return bool(LOOKUPS[self.lookup](value, self.value))
+
+
+def _to_server_key(name):
+    # the reverse of the server key to attribute name conversion
+    # e.g: instance_name -> InstanceName
+    return ''.join(part[:1].upper() + part[1:] for part in name.split('_'))
+
+
+def _retry_page_handler(page_handler, retries, delay):
+    def get_page(params):
+        for attempt in range(retries + 1):
+            try:
+                # the page handler may consume its parameters
+                return page_handler(copy.deepcopy(params))
+            except Exception:
+                if attempt == retries:
+                    raise
+            time.sleep(delay * 2 ** attempt)
+    return get_page
+
+
+def _to_json_data(value):
+    return json.loads(json.dumps(value, sort_keys=True))
+
+
+class ScanCursor(object):
+    """Where a ResourceCollection.scan() is: the server-side filters, the
+    page size, the next page to fetch and how many items were yielded.
+
+    to_dict() and from_dict() turn it into plain JSON-friendly data, to save
+    it and resume the scan later, e.g. in another process. Client-side
+    filters are not part of it: resume with the same collection.
+    """
+
+    def __init__(self, filter_params=None, page_size=None, next_page=1, items_seen=0,
+                 done=False):
+        self.filter_params = filter_params
+        self.page_size = page_size
+        self.next_page = next_page
+        self.items_seen = items_seen
+        self.done = done
+
+    def to_dict(self):
+        return {
+            'filter_params': self.filter_params,
+            'page_size': self.page_size,
+            'next_page': self.next_page,
+            'items_seen': self.items_seen,
+            'done': self.done,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def _advance(self, page, items, limit):
+        # page is what is left of the server items once filtered and limited
+        self.next_page += 1
+        self.items_seen += len(page)
+        self.done = self.items_seen >= limit or not items
 
 
 class ResourceCollection:
+    """An iterable over resources described page by page by the server.
+
+    :param key_names: maps attribute names to server keys, for the keys whose
+        name is not the plain camel case of the attribute name, see only()
+    :param known_keys: the server keys filter() accepts attribute names of;
+        any other attribute name is taken for a typo. Server keys spelled
+        out, such as 'HostName', are always accepted. None accepts anything.
+    :param required_keys: the server keys the resource creator always needs
+    :param server_filter: a function that takes a server key and a value,
+        and returns the (parameter, value) to send to the server to filter on
+        it, or None when the server cannot filter on that key. Without it,
+        every filter is sent as is. See filter().
+    :param max_page_size: the largest page size the server accepts. When
+        it is known and no page size is set, pages are sized from the
+        limit, or to the maximum for full scans.
+    """
 
     def __init__(self, get_resource_page_handler, resource_creator,
-                 limit=None, page_size=None, filter_params=None):
+                 limit=None, page_size=None, filter_params=None,
+                 concurrency=DEFAULT_CONCURRENCY, key_names=None, known_keys=None,
+                 required_keys=(), server_filter=None, max_page_size=None):
         self._page_handler = get_resource_page_handler
         self._resource_creator = resource_creator
         self._limit = limit
         self._page_size = page_size
         self._filter_params = filter_params
+        self._concurrency = concurrency
+        self._key_names = key_names or {}
+        self._required_keys = tuple(required_keys)
+        self._known_keys = frozenset(known_keys) if known_keys is not None else None
+        self._server_filter = server_filter
+        self._max_page_size = max_page_size
+        self._predicates = ()
+        self._only_keys = None
 
     def __iter__(self):
-        count = 0
+        # pages() already stops at the limit
         for page in self.pages():
             for item in page:
                 yield item
 
-                if self._limit is not None and count >= self._limit:
-                    return
-
     def _clone(self):
-        return ResourceCollection(
-            self._page_handler,
-            self._resource_creator,
-            limit=self._limit,
-            page_size=self._page_size,
-            filter_params=copy.deepcopy(self._filter_params),
-        )
+        clone = copy.copy(self)
+        clone._filter_params = copy.deepcopy(self._filter_params)
+        return clone
 
-    def pages(self):
+    def _get_page(self, page_num, page_size):
+        # prepare parameters
+        params = copy.deepcopy(self._filter_params)
+        if params is None:
+            params = {}
+        params['PageNumber'] = page_num
+        if page_size:
+            params['PageSize'] = page_size
+        return self._page_handler(params)
 
-        count = 0
-        page_num = 1
+    def _get_prefetch_window(self):
+        # With client-side filters and a limit, the next page may already
+        # complete the limit, so the pages in flight start at one and double
+        # with every page that did not. Otherwise all `concurrency` pages.
+        if self._predicates and self._limit is not None:
+            return 1
+        return self._concurrency
 
-        while True:
+    def _get_page_items(self, page_nums, page_size):
+        # Yield the items of each page in order. The page numbers are known
+        # up front, so with concurrency > 1 they are fetched on a bounded
+        # worker pool with at most `concurrency` requests in flight.
+        page_nums = iter(page_nums)
+        if self._concurrency <= 1:
+            for page_num in page_nums:
+                yield self._get_page(page_num, page_size)[3]
+            return
 
-            # prepare parameters
-            params = copy.deepcopy(self._filter_params)
-            if params is None:
-                params = {}
-            params['PageNumber'] = page_num
-            if self._page_size:
-                params['PageSize'] = self._page_size
+        executor = ThreadPoolExecutor(max_workers=self._concurrency)
+        futures = deque()
+        window = self._get_prefetch_window()
 
-            total_count, page_size, page_num, items = self._page_handler(params)
-            if self._limit is not None:
-                limit = min(total_count, self._limit)
-            else:
-                limit = total_count
+        def submit_next():
+            page_num = next(page_nums, None)
+            if page_num is not None:
+                futures.append(executor.submit(self._get_page, page_num, page_size))
+            return page_num is not None
 
-            resources = []
-            for item in items:
-                resource = self._resource_creator(item)
-                resources.append(resource)
-                count += 1
-                if count >= limit:
-                    break
-            yield resources
-            if count >= limit:
+        try:
+            for _ in range(window):
+                submit_next()
+            while futures:
+                items = futures.popleft().result()[3]
+                if window == self._concurrency:
+                    submit_next()
+                    yield items
+                    continue
+                yield items
+                # the consumer asked for more, so the limit was not reached
+                window = min(window * 2, self._concurrency)
+                while len(futures) < window and submit_next():
+                    pass
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def pages(self, raw=False):
+        """Yield the collection page by page.
+
+        With raw=True the pages hold the dicts sent by the server, and no
+        resource object is created.
+        """
+
+        # the first page tells us the total count and the page size in use
+        total_count, page_size, page_num, items = self._get_page(1, self._get_page_size())
+        limit = self._get_limit(total_count)
+        remaining_pages = self._get_remaining_page_nums(total_count, limit, page_size)
+
+        make_page = self._get_items if raw else self._create_resources
+        count = 0
+        for items in self._chain_first_page(items, remaining_pages, page_size):
+            page = make_page(items, limit - count)
+            count += len(page)
+            yield page
+            if count >= limit or not items:
                 break
-            page_num += 1
+
+    def scan(self, cursor=None, raw=False, page_retries=3, retry_delay=1):
+        """Yield the collection page by page, keeping track in a ScanCursor.
+
+        Pass the cursor of an interrupted scan to resume it at the first
+        page it did not yield. The cursor is updated before each page is
+        yielded, so save it once the page is handled. A failed page is
+        retried page_retries times, retry_delay seconds apart and doubling;
+        if it still fails, the error is raised and the cursor stays on it.
+        Pages are numbered as on the server, so resources created or deleted
+        in between shift what the remaining pages hold.
+        """
+        cursor = self._get_scan_cursor(cursor)
+        if cursor.done:
+            return
+
+        collection = self._clone()
+        collection._page_handler = _retry_page_handler(self._page_handler, page_retries,
+                                                       retry_delay)
+        total_count, page_size, page_num, items = collection._get_page(
+            cursor.next_page, cursor.page_size or self._get_page_size())
+        # resumed scans must keep the page boundaries of the first one
+        cursor.page_size = cursor.page_size or page_size
+        limit = self._get_limit(total_count)
+        remaining_pages = self._get_remaining_page_nums(total_count, limit, page_size,
+                                                        cursor.next_page)
+
+        make_page = self._get_items if raw else self._create_resources
+        for items in collection._chain_first_page(items, remaining_pages, page_size):
+            page = make_page(items, limit - cursor.items_seen)
+            cursor._advance(page, items, limit)
+            yield page
+            if cursor.done:
+                return
+        cursor.done = True
+
+    def _get_scan_cursor(self, cursor):
+        if cursor is None:
+            cursor = ScanCursor()
+        # compared as they come back from JSON, e.g. tuples as lists
+        filter_params = _to_json_data(self._filter_params or {})
+        if cursor.filter_params is None:
+            cursor.filter_params = filter_params
+        elif _to_json_data(cursor.filter_params) != filter_params:
+            raise ValueError("The cursor belongs to a scan with other filters.")
+        return cursor
+
+    def raw(self):
+        """Yield the dicts sent by the server instead of resource objects."""
+        for page in self.pages(raw=True):
+            for item in page:
+                yield item
+
+    def to_columns(self, fields, numpy=False):
+        """Build a column-oriented table of the given fields.
+
+        Returns a dict that maps each field to the list of its values, in the
+        order of the collection. Integer and float columns are arrays from
+        the array module, equal strings share one object, and with
+        numpy=True every column is turned into a NumPy array. Fields are
+        resolved as in only().
+        """
+        builder = self._get_column_builder(fields)
+        for page in self.pages(raw=True):
+            builder.add_items(page)
+        return builder.build(numpy=numpy)
+
+    def _get_column_builder(self, fields):
+        fields = list(fields)
+        return _ColumnBuilder(fields, [self._get_server_key(field) for field in fields])
+
+    def _get_items(self, items, max_count):
+        for predicate in self._predicates:
+            items = [item for item in items if predicate(item)]
+        if max_count < len(items):
+            items = items[:max(max_count, 0)]
+        only_keys = self._only_keys
+        if only_keys is not None:
+            items = [dict((key, item[key]) for key in only_keys if key in item)
+                     for item in items]
+        return items
+
+    def _create_resources(self, items, max_count):
+        resources = []
+        for item in self._get_items(items, max_count):
+            resource = self._resource_creator(item)
+            resources.append(resource)
+        return resources
+
+    def _get_server_key(self, name):
+        if name in self._key_names:
+            return self._key_names[name]
+        if name[:1].isupper():
+            return name
+        return _to_server_key(name)
+
+    def _get_page_size(self):
+        page_size = self._page_size
+        limit = self._limit
+        if limit is None or self._predicates:
+            # any page may hold the next match
+            return page_size or self._max_page_size
+        if page_size:
+            return min(page_size, limit)
+        if self._max_page_size is None:
+            return None
+        # as few requests as possible, each as small as possible, e.g. a
+        # limit of 150 with a maximum of 100 makes two pages of 75
+        page_count = int(math.ceil(float(limit) / self._max_page_size))
+        return int(math.ceil(float(limit) / page_count))
+
+    def _get_limit(self, total_count):
+        if self._limit is not None:
+            return min(total_count, self._limit)
+        return total_count
+
+    def _get_remaining_page_nums(self, total_count, limit, page_size, first_page_num=1):
+        if not page_size:
+            return []
+        if self._predicates:
+            # any page may be the one that holds the next match
+            limit = total_count
+        return range(first_page_num + 1, int(math.ceil(float(limit) / page_size)) + 1)
+
+    def _chain_first_page(self, first_page_items, page_nums, page_size):
+        yield first_page_items
+        for items in self._get_page_items(page_nums, page_size):
+            yield items
+
+    def count(self):
+        """Return how many resources the collection holds, up to the limit.
+
+        The server counts: one request with a page size of 1 is enough.
+        Only client-side filters make it scan the collection, without
+        creating resource objects.
+        """
+        if self._predicates:
+            return sum(len(page) for page in self.pages(raw=True))
+        return self._get_limit(self._get_page(1, 1)[0])
+
+    def exists(self):
+        """Tell whether the collection holds any resource, see count()."""
+        if self._predicates:
+            return any(self.limit(1).pages(raw=True))
+        return self._get_page(1, 1)[0] > 0
 
     def all(self):
         return self
 
     def filter(self, **params):
+        """Narrow the collection down.
+
+        Filters the server can evaluate are sent with the request. Other
+        ones are applied to each page as it arrives:
+
+        * a callable value, called with the value of the field,
+          e.g. filter(instance_name=lambda name: 'web' in name)
+        * a lookup appended to the field name, one of LOOKUPS,
+          e.g. filter(cpu__gte=4, status__in=['Running', 'Starting'])
+        * a plain value for a field the server cannot filter on,
+          e.g. filter(cpu=4)
+
+        Filtering on an unknown attribute name raises a ValueError rather
+        than returning the whole collection. Fields the collection does not
+        know of can still be filtered on by their server key, e.g.
+        filter(NewField='value').
+        """
         clone = self._clone()
         if clone._filter_params is None:
-            clone._filter_params = copy.deepcopy(params)
-        else:
-            clone._filter_params.update(params)
+            clone._filter_params = {}
+        predicates = list(clone._predicates)
+        for key, value in params.items():
+            if self._server_filter is None:
+                clone._filter_params[key] = copy.deepcopy(value)
+                continue
+
+            field, lookup = key, None
+            if '__' in key and key.rsplit('__', 1)[1] in LOOKUPS:
+                field, lookup = key.rsplit('__', 1)
+            server_key = self._get_server_key(field)
+
+            if lookup is None and not callable(value):
+                server_filter = self._server_filter(server_key, value)
+                if server_filter is not None:
+                    clone._filter_params[server_filter[0]] = copy.deepcopy(server_filter[1])
+                    continue
+            if self._known_keys is not None and server_key not in self._known_keys \
+                    and not field[:1].isupper():
+                raise ValueError("Cannot filter on unknown field '{0}'.".format(field))
+            predicates.append(_Predicate(server_key, lookup or 'eq', value))
+        clone._predicates = tuple(predicates)
+        return clone
+
+    def only(self, *fields):
+        """Only hydrate the given fields of each resource.
+
+        Fields are attribute names such as 'zone_id' or server keys such as
+        'ZoneId'. Every other field of the server response is skipped.
+        """
+        if not fields:
+            raise ValueError("only() needs at least one field.")
+        clone = self._clone()
+        only_keys = set(clone._only_keys or ()).union(self._required_keys)
+        only_keys.update(self._get_server_key(field) for field in fields)
+        clone._only_keys = frozenset(only_keys)
         return clone
 
     def _check_count(self, count):
@@ -101,3 +599,34 @@ class ResourceCollection:
         clone = self._clone()
         clone._page_size = count
         return clone
+
+    def _do_bulk_action(self, action_name, max_workers=None):
+        # list everything first: the action may change what later pages hold
+        return _run_bulk_action(list(self), action_name, max_workers or self._concurrency)
+
+    def start(self, max_workers=None):
+        """Start every resource of the collection, see stop()."""
+        return self._do_bulk_action('start', max_workers)
+
+    def stop(self, max_workers=None):
+        """Stop every resource of the collection.
+
+        Resources are stopped on a pool of max_workers threads, by default as
+        many as the page concurrency. Failures do not stop the others; the
+        returned BulkActionReport tells how each resource went.
+        """
+        return self._do_bulk_action('stop', max_workers)
+
+    def reboot(self, max_workers=None):
+        """Reboot every resource of the collection, see stop()."""
+        return self._do_bulk_action('reboot', max_workers)
+
+    def delete(self, max_workers=None):
+        """Delete every resource of the collection, see stop()."""
+        return self._do_bulk_action('delete', max_workers)
+
+    def concurrency(self, count):
+        self._check_count(count)
+        clone = self._clone()
+        clone._concurrency = count
+        return clone
@@ -0,0 +1,81 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""JSON decoding of raw response bodies.
+
+Decoders take the raw response bytes; orjson and ujson parse them without
+building an intermediate str. The fastest available backend is the default:
+orjson, then ujson, then the json module of the standard library. Other
+backends can be added with register_decoder().
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _json_loads(data):
+    # json.loads would also sniff the encoding of bytes, responses are UTF-8
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+_decoders = {'json': _json_loads}
+if ujson is not None:
+    _decoders['ujson'] = ujson.loads
+if orjson is not None:
+    _decoders['orjson'] = orjson.loads
+
+_default_decoder_name = 'orjson' if orjson else 'ujson' if ujson else 'json'
+_default_decoder = _decoders[_default_decoder_name]
+
+
+def register_decoder(name, loads):
+    """Make a decoder available; loads takes bytes and returns an object."""
+    _decoders[name] = loads
+
+
+def available_decoders():
+    return sorted(_decoders)
+
+
+def get_decoder(name=None):
+    """Return the decoder called name, or the default one."""
+    if name is None:
+        return _default_decoder
+    if name not in _decoders:
+        raise ValueError("Unknown JSON decoder '{0}', available ones are: {1}.".format(
+            name, ', '.join(available_decoders())))
+    return _decoders[name]
+
+
+def set_default_decoder(name):
+    global _default_decoder, _default_decoder_name
+    _default_decoder = get_decoder(name)
+    _default_decoder_name = name
+
+
+def get_default_decoder_name():
+    return _default_decoder_name
+
+
+def decode(data):
+    return _default_decoder(data)
@@ -0,0 +1,148 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import bisect
+import threading
+
+from aliyunsdkcore.vendored.six import iteritems
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestObserver(object):
+    """Base class of the observers of ServiceResource requests.
+
+    The hooks run for every attempt that goes to the client, retries
+    included, on the thread that sends the request; responses served by a
+    ResponseCache or shared by a SingleFlight are not seen. An exception
+    raised by a hook fails the request.
+    """
+
+    def before_request(self, request):
+        pass
+
+    def after_response(self, request, response, latency):
+        """Called with the raw response body and the seconds it took."""
+        pass
+
+    def on_error(self, request, error, latency, will_retry):
+        """Called with the error of an attempt; will_retry tells whether the
+        RetryPolicy of the resource sends the request again."""
+        pass
+
+
+class _ActionMetrics(object):
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.response_bytes = 0
+        self.latency_sum = 0.0
+        # one count per bucket, plus the +Inf one
+        self.latency_buckets = [0] * (bucket_count + 1)
+
+
+class RequestMetrics(RequestObserver):
+    """Aggregates per action request counts, errors, retries, latency
+    histogram and response bytes.
+
+    Pass it as an observer, e.g. get_resource('ecs', ..., observers=[metrics]),
+    and export with to_dict() or to_prometheus(). It is thread-safe.
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._actions = {}
+        self._lock = threading.Lock()
+
+    def _record(self, request, latency):
+        # called with the lock held
+        action_name = request.get_action_name()
+        metrics = self._actions.get(action_name)
+        if metrics is None:
+            metrics = self._actions[action_name] = _ActionMetrics(len(self.latency_buckets))
+        metrics.count += 1
+        metrics.latency_sum += latency
+        metrics.latency_buckets[bisect.bisect_left(self.latency_buckets, latency)] += 1
+        return metrics
+
+    def after_response(self, request, response, latency):
+        with self._lock:
+            metrics = self._record(request, latency)
+            metrics.response_bytes += len(response or b'')
+
+    def on_error(self, request, error, latency, will_retry):
+        with self._lock:
+            metrics = self._record(request, latency)
+            metrics.errors += 1
+            if will_retry:
+                metrics.retries += 1
+
+    def reset(self):
+        with self._lock:
+            self._actions.clear()
+
+    def to_dict(self):
+        """Return {action name: metrics}, with a cumulative latency
+        histogram as a list of (upper bound, count) pairs."""
+        with self._lock:
+            result = {}
+            for action_name, metrics in iteritems(self._actions):
+                cumulative = 0
+                histogram = []
+                for bound, count in zip(self.latency_buckets + (float('inf'),),
+                                        metrics.latency_buckets):
+                    cumulative += count
+                    histogram.append((bound, cumulative))
+                result[action_name] = {
+                    'count': metrics.count,
+                    'errors': metrics.errors,
+                    'retries': metrics.retries,
+                    'response_bytes': metrics.response_bytes,
+                    'latency_sum': metrics.latency_sum,
+                    'latency_histogram': histogram,
+                }
+            return result
+
+    def to_prometheus(self, prefix='alibabacloud'):
+        """Return the metrics in the Prometheus text exposition format."""
+        actions = sorted(iteritems(self.to_dict()))
+        lines = []
+
+        def add_counter(name, key, help_text):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, help_text))
+            lines.append('# TYPE {0}_{1} counter'.format(prefix, name))
+            for action_name, metrics in actions:
+                lines.append('{0}_{1}{{action="{2}"}} {3}'.format(
+                    prefix, name, action_name, metrics[key]))
+
+        add_counter('requests_total', 'count', 'Requests sent to the client, retries included.')
+        add_counter('request_errors_total', 'errors', 'Requests that raised an error.')
+        add_counter('request_retries_total', 'retries', 'Failed requests that were retried.')
+        add_counter('response_bytes_total', 'response_bytes', 'Bytes of the response bodies.')
+
+        name = '{0}_request_duration_seconds'.format(prefix)
+        lines.append('# HELP {0} Request latency.'.format(name))
+        lines.append('# TYPE {0} histogram'.format(name))
+        for action_name, metrics in actions:
+            for bound, count in metrics['latency_histogram']:
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append('{0}_bucket{{action="{1}",le="{2}"}} {3}'.format(
+                    name, action_name, le, count))
+            lines.append('{0}_sum{{action="{1}"}} {2!r}'.format(
+                name, action_name, metrics['latency_sum']))
+            lines.append('{0}_count{{action="{1}"}} {2}'.format(
+                name, action_name, metrics['count']))
+        return '\n'.join(lines) + '\n'
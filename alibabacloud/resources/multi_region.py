@@ -0,0 +1,200 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from aliyunsdkcore.vendored.six.moves import queue
+
+from alibabacloud.resources.collection import DEFAULT_CONCURRENCY, _run_bulk_action
+
+
+class MultiRegionCollection(object):
+    """Merges the collections of several regions into one iterable.
+
+    Every region is scanned on its own thread and pages are yielded as they
+    arrive, so a full scan takes about as long as the slowest region. The
+    pages of one region keep their order, but the regions interleave. Items
+    are tagged with the id of their region: raw dicts get a 'RegionId' key
+    and resources a region_id attribute when the server did not send one.
+
+    :param collections: a list of (region id, ResourceCollection) pairs
+    """
+
+    # how many pages each region may fetch ahead of the consumer
+    MAX_PENDING_PAGES = 2
+
+    def __init__(self, collections, limit=None):
+        self._collections = list(collections)
+        self._limit = limit
+
+    def __iter__(self):
+        for page in self.pages():
+            for item in page:
+                yield item
+
+    def _map(self, method_name, *args):
+        clone = copy.copy(self)
+        clone._collections = [(region_id, getattr(collection, method_name)(*args))
+                              for region_id, collection in self._collections]
+        return clone
+
+    @staticmethod
+    def _tag(page, region_id, raw):
+        for item in page:
+            if raw:
+                item.setdefault('RegionId', region_id)
+            elif getattr(item, 'region_id', None) is None:
+                item.region_id = region_id
+
+    @staticmethod
+    def _put(pages, entry, stopped):
+        # give up once the consumer is gone, instead of blocking forever
+        while not stopped.is_set():
+            try:
+                pages.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _scan_region(self, region_id, collection, raw, pages, stopped):
+        try:
+            for page in collection.pages(raw=raw):
+                self._tag(page, region_id, raw)
+                if not self._put(pages, (region_id, page, None), stopped):
+                    return
+        except Exception as e:
+            self._put(pages, (region_id, None, e), stopped)
+        else:
+            self._put(pages, (region_id, None, None), stopped)
+
+    def pages(self, raw=False):
+        """Yield the pages of all regions as they arrive.
+
+        Empty pages are skipped. An error in any region is raised here and
+        stops the other regions.
+        """
+        if not self._collections:
+            return
+
+        pages = queue.Queue(maxsize=len(self._collections) * self.MAX_PENDING_PAGES)
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(self._collections))
+        try:
+            for region_id, collection in self._collections:
+                executor.submit(self._scan_region, region_id, collection, raw, pages, stopped)
+
+            remaining = len(self._collections)
+            count = 0
+            while remaining:
+                region_id, page, error = pages.get()
+                if error is not None:
+                    raise error
+                if page is None:
+                    remaining -= 1
+                    continue
+                if self._limit is not None:
+                    page = page[:self._limit - count]
+                count += len(page)
+                if page:
+                    yield page
+                if self._limit is not None and count >= self._limit:
+                    return
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False)
+
+    def raw(self):
+        """Yield the dicts sent by the servers instead of resource objects."""
+        for page in self.pages(raw=True):
+            for item in page:
+                yield item
+
+    def to_columns(self, fields, numpy=False):
+        """Build a column-oriented table of all regions, see
+        ResourceCollection.to_columns. Add 'RegionId' to the fields to know
+        the region of each row.
+        """
+        builder = self._collections[0][1]._get_column_builder(fields)
+        for page in self.pages(raw=True):
+            builder.add_items(page)
+        return builder.build(numpy=numpy)
+
+    def _map_regions(self, method_name):
+        executor = ThreadPoolExecutor(max_workers=max(len(self._collections), 1))
+        try:
+            futures = [executor.submit(getattr(collection, method_name))
+                       for region_id, collection in self._collections]
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False)
+
+    def count(self):
+        """Return how many resources all regions hold, up to the limit.
+
+        The regions are counted concurrently, see ResourceCollection.count().
+        """
+        count = sum(self._map_regions('count'))
+        if self._limit is not None:
+            return min(count, self._limit)
+        return count
+
+    def exists(self):
+        return any(self._map_regions('exists'))
+
+    def all(self):
+        return self
+
+    def filter(self, **params):
+        clone = copy.copy(self)
+        clone._collections = [(region_id, collection.filter(**params))
+                              for region_id, collection in self._collections]
+        return clone
+
+    def only(self, *fields):
+        return self._map('only', *fields)
+
+    def limit(self, count):
+        # no region needs to return more than count items either
+        clone = self._map('limit', count)
+        clone._limit = count
+        return clone
+
+    def page_size(self, count):
+        return self._map('page_size', count)
+
+    def concurrency(self, count):
+        """Set how many pages each region prefetches concurrently."""
+        return self._map('concurrency', count)
+
+    def _do_bulk_action(self, action_name, max_workers=None):
+        # each resource keeps the client of its region
+        return _run_bulk_action(list(self), action_name, max_workers or DEFAULT_CONCURRENCY)
+
+    def start(self, max_workers=None):
+        """Start every resource of every region, see ResourceCollection.stop()."""
+        return self._do_bulk_action('start', max_workers)
+
+    def stop(self, max_workers=None):
+        """Stop every resource of every region, see ResourceCollection.stop()."""
+        return self._do_bulk_action('stop', max_workers)
+
+    def reboot(self, max_workers=None):
+        """Reboot every resource of every region, see ResourceCollection.stop()."""
+        return self._do_bulk_action('reboot', max_workers)
+
+    def delete(self, max_workers=None):
+        """Delete every resource of every region, see ResourceCollection.stop()."""
+        return self._do_bulk_action('delete', max_workers)
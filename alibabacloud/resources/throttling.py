@@ -0,0 +1,138 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import random
+import threading
+import time
+
+from aliyunsdkcore.acs_exception.exceptions import ClientException, ServerException
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket refilled at `rate` tokens per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._last_time = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_time) * self.rate)
+        self._last_time = now
+
+    def acquire(self, tokens=1):
+        """Take tokens from the bucket, sleeping until enough are available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter(object):
+    """Client-side rate limits, in requests per second.
+
+    :param rate: the limit of every action without one in action_rates, or
+        None for no limit
+    :param action_rates: a dict that maps action names, e.g.
+        'DescribeInstances', to their own limit
+    """
+
+    def __init__(self, rate=None, action_rates=None):
+        self.rate = rate
+        self.action_rates = dict(action_rates or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, action_name):
+        bucket = self._buckets.get(action_name)
+        if bucket is None:
+            rate = self.action_rates.get(action_name, self.rate)
+            if rate is None:
+                return None
+            with self._lock:
+                bucket = self._buckets.setdefault(action_name, TokenBucket(rate))
+        return bucket
+
+    def acquire(self, action_name):
+        bucket = self._get_bucket(action_name)
+        if bucket is not None:
+            bucket.acquire()
+
+
+class RetryPolicy(object):
+    """Retries throttled and transient failures with decorrelated jitter backoff.
+
+    Throttling errors are retried for every action, since the server did not
+    run the request. Other transient errors are only retried for read-only
+    actions, because a mutating request may have taken effect before failing.
+
+    An AcsClient made with auto_retry=True (the default) retries on its own
+    underneath, so every attempt here may be several on the wire, none of
+    which observers see. get_resource() makes its clients with
+    auto_retry=False when a retry_policy is given; do the same for clients
+    made by hand.
+
+    :param max_retries: how many times a request is retried at most
+    :param base_delay: the shortest delay between two attempts, in seconds
+    :param max_delay: the longest delay between two attempts, in seconds
+    """
+
+    THROTTLING_ERROR_CODES = frozenset([
+        'Throttling',
+        'Throttling.User',
+        'Throttling.Api',
+        'Throttling.Resource',
+    ])
+    TRANSIENT_ERROR_CODES = frozenset([
+        'SDK.HttpError',
+        'SDK.ServerUnreachable',
+        'InternalError',
+        'ServiceUnavailable',
+        'UnknownError',
+    ])
+
+    def __init__(self, max_retries=5, base_delay=0.1, max_delay=20,
+                 read_only_prefixes=('Describe',)):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.read_only_prefixes = tuple(read_only_prefixes)
+
+    def should_retry(self, request, error, retries):
+        if retries >= self.max_retries:
+            return False
+        if not isinstance(error, (ClientException, ServerException)):
+            return False
+        error_code = error.get_error_code()
+        if error_code in self.THROTTLING_ERROR_CODES:
+            return True
+        if isinstance(error, ServerException) and (error.get_http_status() or 0) >= 500:
+            is_transient = True
+        else:
+            is_transient = error_code in self.TRANSIENT_ERROR_CODES
+        return is_transient and request.get_action_name().startswith(self.read_only_prefixes)
+
+    def delays(self):
+        # "decorrelated jitter": each delay is drawn between the base delay
+        # and three times the previous one
+        delay = self.base_delay
+        while True:
+            delay = min(self.max_delay, random.uniform(self.base_delay, delay * 3))
+            yield delay
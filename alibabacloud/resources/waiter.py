@@ -0,0 +1,76 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import random
+
+
+class PollStrategy(object):
+    """Decides how long a waiter sleeps between two polls.
+
+    Strategies are stateless: every wait asks for a fresh sequence of delays.
+    """
+
+    def delays(self, current_status, target_status):
+        """Return an iterator over the delays, in seconds, between polls.
+
+        current_status is the status seen by the first poll, or None if it
+        is not known.
+        """
+        raise NotImplementedError
+
+
+class FixedPollStrategy(PollStrategy):
+
+    def __init__(self, interval=1):
+        self.interval = interval
+
+    def delays(self, current_status, target_status):
+        while True:
+            yield self.interval
+
+
+class BackoffPollStrategy(PollStrategy):
+    """Exponential backoff with jitter.
+
+    :param initial_delay: the first delay, in seconds
+    :param max_delay: no delay is longer than this
+    :param multiplier: how much each delay grows over the previous one
+    :param jitter: the fraction of each delay that is randomized, so that
+        many waiters do not poll in lockstep
+    :param expected_durations: a dict that maps a (current_status,
+        target_status) transition to how long it usually takes in seconds.
+        The first poll of a known transition is delayed by half of the
+        expected duration, after which polling backs off from initial_delay.
+    """
+
+    def __init__(self, initial_delay=0.5, max_delay=10, multiplier=2, jitter=0.5,
+                 expected_durations=None):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.expected_durations = expected_durations or {}
+
+    def _with_jitter(self, delay):
+        delay = min(delay, self.max_delay)
+        return delay - delay * self.jitter * random.random()
+
+    def delays(self, current_status, target_status):
+        expected = self.expected_durations.get((current_status, target_status))
+        if expected:
+            yield self._with_jitter(expected / 2.0)
+
+        delay = self.initial_delay
+        while True:
+            yield self._with_jitter(delay)
+            delay = min(delay * self.multiplier, self.max_delay)
@@ -11,3 +11,50 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import importlib
+
+# service name -> {kind: 'module:ClassName'}, see register_service()
+_services = {}
+_classes = {}
+
+
+def register_service(service_name, resource, multi_region_resource=None, async_resource=None):
+    """Register the resource classes of a service by their dotted paths,
+    e.g. 'alibabacloud.services.ecs:ECSResource'.
+
+    Nothing is imported here: a service module and its request classes are
+    only loaded the first time get_service_class() asks for them.
+    """
+    _services[service_name.lower()] = {
+        'resource': resource,
+        'multi_region': multi_region_resource,
+        'async': async_resource,
+    }
+
+
+def get_service_class(service_name, kind='resource'):
+    """Return the resource class of a service, importing it on first use.
+
+    kind is 'resource', 'multi_region' or 'async'. Returns None when the
+    service or this kind of resource is not registered.
+    """
+    path = _services.get(service_name.lower(), {}).get(kind)
+    if path is None:
+        return None
+    cls = _classes.get(path)
+    if cls is None:
+        module_name, class_name = path.split(':')
+        cls = _classes[path] = getattr(importlib.import_module(module_name), class_name)
+    return cls
+
+
+def available_services():
+    return sorted(_services)
+
+
+register_service(
+    'ecs',
+    'alibabacloud.services.ecs:ECSResource',
+    multi_region_resource='alibabacloud.services.ecs:MultiRegionECSResource',
+    async_resource='alibabacloud.services.async_ecs:AsyncECSResource',
+)
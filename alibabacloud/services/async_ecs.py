@@ -0,0 +1,168 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import time
+
+from aliyunsdkecs.request.v20140526.CreateInstanceRequest import CreateInstanceRequest
+from aliyunsdkecs.request.v20140526.DescribeInstancesRequest import DescribeInstancesRequest
+from aliyunsdkecs.request.v20140526.StartInstanceRequest import StartInstanceRequest
+from aliyunsdkecs.request.v20140526.StopInstanceRequest import StopInstanceRequest
+from aliyunsdkecs.request.v20140526.DeleteInstanceRequest import DeleteInstanceRequest
+from aliyunsdkecs.request.v20140526.RunInstancesRequest import RunInstancesRequest
+from aliyunsdkecs.request.v20140526.RebootInstanceRequest import RebootInstanceRequest
+
+from alibabacloud.resources.async_base import AsyncServiceResource
+from alibabacloud.resources.async_collection import AsyncResourceCollection
+from alibabacloud.services.ecs import ECSInstanceResource, ECSResource
+
+
+class AsyncECSInstanceResource(AsyncServiceResource, ECSInstanceResource):
+
+    __slots__ = ('_executor',)
+
+    def __init__(self, instance_id, client=None, executor=None, **options):
+        ECSInstanceResource.__init__(self, instance_id, client=client, **options)
+        self._executor = executor
+
+    async def refresh(self):
+        request = DescribeInstancesRequest()
+        request.set_InstanceIds(json.dumps([self.instance_id]))
+        attrs = (await self._get_respone(request, {}, keys=['Instances', 'Instance']))[0]
+        self.set_instance_attributes(attrs)
+
+    async def wait_until(self, target_status, timeout=120, poll_strategy=None):
+        poll_strategy = poll_strategy or self.DEFAULT_POLL_STRATEGY
+        deadline = time.time() + timeout
+        delays = None
+        while True:
+            await self.refresh()
+            if self.status == target_status:
+                return
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise Exception("Timed out: no {0} status after {1} seconds.".format(
+                    target_status, timeout))
+            if delays is None:
+                delays = poll_strategy.delays(self.status, target_status)
+            await asyncio.sleep(min(next(delays), remaining))
+
+    async def start(self):
+        request = StartInstanceRequest()
+        request.set_InstanceId(self.instance_id)
+        await self._do_request(request, {})
+
+    async def stop(self):
+        request = StopInstanceRequest()
+        request.set_InstanceId(self.instance_id)
+        await self._do_request(request, {})
+
+    async def reboot(self):
+        request = RebootInstanceRequest()
+        request.set_InstanceId(self.instance_id)
+        await self._do_request(request, {})
+
+    async def delete(self):
+        request = DeleteInstanceRequest()
+        request.set_InstanceId(self.instance_id)
+        await self._do_request(request, {})
+
+
+class AsyncECSResource(AsyncServiceResource, ECSResource):
+
+    def __init__(self, client=None, executor=None, **options):
+        AsyncServiceResource.__init__(self, 'ecs', client=client, executor=executor, **options)
+        self.instances = self._init_instances()
+
+    def _init_instances(self):
+        return AsyncResourceCollection(
+            self._describe_instances,
+            self._create_instance_from_data,
+            key_names=ECSInstanceResource.SERVER_KEYS,
+            known_keys=ECSInstanceResource.ATTRIBUTE_NAMES,
+            required_keys=['InstanceId'],
+            server_filter=self._get_server_filter,
+            max_page_size=self.MAX_PAGE_SIZE,
+        )
+
+    async def _describe_instances(self, params):
+        request = DescribeInstancesRequest()
+        self._handle_instance_ids(params)
+        response = await self._do_request(request, params)
+        return self._parse_instances_page(response)
+
+    def _new_instance_resource(self, instance_id):
+        return AsyncECSInstanceResource(instance_id, client=self._client,
+                                        executor=self._get_executor(), **self._get_options())
+
+    async def _describe_instances_by_ids(self, instance_ids):
+        request = DescribeInstancesRequest()
+        request.set_InstanceIds(json.dumps(instance_ids))
+        request.set_PageSize(len(instance_ids))
+        return await self._get_respone(request, {}, keys=['Instances', 'Instance'])
+
+    async def refresh_all(self, instances):
+        pending = self._group_by_instance_id(instances)
+        chunks = self._chunk_instance_ids(list(pending))
+        pages = await asyncio.gather(*[self._describe_instances_by_ids(instance_ids)
+                                       for instance_ids in chunks])
+        for items in pages:
+            for attrs in items:
+                for instance in pending.pop(attrs['InstanceId'], []):
+                    instance.set_instance_attributes(attrs)
+        return [instance for group in pending.values() for instance in group]
+
+    async def wait_until_all(self, instances, target_status, timeout=120, poll_strategy=None):
+        poll_strategy = poll_strategy or ECSInstanceResource.DEFAULT_POLL_STRATEGY
+        start_time = time.time()
+        deadline = start_time + timeout
+        delays = None
+        results = {}
+        pending = self._group_by_instance_id(instances)
+        while pending:
+            chunks = self._chunk_instance_ids(list(pending))
+            pages = await asyncio.gather(*[self._describe_instances_by_ids(instance_ids)
+                                           for instance_ids in chunks])
+            for items in pages:
+                for attrs in items:
+                    self._update_pending_instances(
+                        pending, attrs, target_status, results, start_time)
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+            if delays is None:
+                delays = poll_strategy.delays(self._get_pending_status(pending), target_status)
+            await asyncio.sleep(min(next(delays), remaining))
+
+        for instance_id in pending:
+            results[instance_id] = None
+        return results
+
+    async def create_instance(self, **params):
+        request = CreateInstanceRequest()
+        instance_id = await self._get_respone(request, params, key='InstanceId')
+        return self._new_instance_resource(instance_id)
+
+    async def run_instances(self, **params):
+        request = RunInstancesRequest()
+        instance_ids = await self._get_respone(
+            request, params, keys=['InstanceIdSets', 'InstanceIdSet'])
+
+        instances = []
+        for instance_id in instance_ids:
+            instance = self._new_instance_resource(instance_id)
+            instances.append(instance)
+        return instances
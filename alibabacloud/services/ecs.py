@@ -15,6 +15,7 @@
 import re
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from aliyunsdkecs.request.v20140526.CreateInstanceRequest import CreateInstanceRequest
 from aliyunsdkecs.request.v20140526.DescribeInstancesRequest import DescribeInstancesRequest
@@ -23,56 +24,106 @@ from aliyunsdkecs.request.v20140526.StopInstanceRequest import StopInstanceReque
 from aliyunsdkecs.request.v20140526.DeleteInstanceRequest import DeleteInstanceRequest
 from aliyunsdkecs.request.v20140526.RunInstancesRequest import RunInstancesRequest
 from aliyunsdkecs.request.v20140526.RebootInstanceRequest import RebootInstanceRequest
-from aliyunsdkcore.vendored.six import iteritems
+from aliyunsdkcore.vendored.six import iteritems, string_types
 
 from alibabacloud.resources.base import ServiceResource
 from alibabacloud.resources.collection import ResourceCollection
+from alibabacloud.resources.multi_region import MultiRegionCollection
+from alibabacloud.resources.waiter import BackoffPollStrategy
+
+
+def _to_attribute_name(name):
+    # covert name from camel case to snake case
+    # e.g: InstanceName -> instance_name
+    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
+    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+
+
+# the keys of an instance in a DescribeInstances response
+_INSTANCE_KEYS = (
+    'AutoReleaseTime', 'ClusterId', 'Cpu', 'CpuOptions', 'CreationTime', 'CreditSpecification',
+    'DedicatedHostAttribute', 'DedicatedInstanceAttribute', 'DeploymentSetGroupNo',
+    'DeploymentSetId', 'Description', 'DeviceAvailable', 'EcsCapacityReservationAttr',
+    'EipAddress', 'ExpiredTime', 'GPUAmount', 'GPUSpec', 'HibernationOptions', 'HostName',
+    'HpcClusterId', 'ImageId', 'InnerIpAddress', 'InstanceChargeType', 'InstanceId',
+    'InstanceName', 'InstanceNetworkType', 'InstanceType', 'InstanceTypeFamily',
+    'InternetChargeType', 'InternetMaxBandwidthIn', 'InternetMaxBandwidthOut', 'IoOptimized',
+    'ISP', 'KeyPairName', 'LocalStorageAmount', 'LocalStorageCapacity', 'Memory',
+    'MetadataOptions', 'NetworkInterfaces', 'OperationLocks', 'OSName', 'OSNameEn', 'OSType',
+    'PublicIpAddress', 'RdmaIpAddress', 'Recyclable', 'RegionId', 'ResourceGroupId', 'SaleCycle',
+    'SecurityGroupIds', 'SerialNumber', 'SpotDuration', 'SpotInterruptionBehavior',
+    'SpotPriceLimit', 'SpotStrategy', 'StartTime', 'Status', 'StoppedMode', 'Tags', 'VlanId',
+    'VpcAttributes', 'ZoneId',
+)
+
+# attribute names of the keys outside of _INSTANCE_KEYS, converted on first use
+_extra_attribute_names = {}
+
+
+def _get_extra_attribute_name(key):
+    name = _extra_attribute_names.get(key)
+    if name is None:
+        name = _extra_attribute_names[key] = _to_attribute_name(key)
+    return name
 
 
 class ECSInstanceResource(ServiceResource):
 
+    STATUS_PENDING = "Pending"
     STATUS_RUNNING = "Running"
     STATUS_STARTING = "Starting"
     STATUS_STOPPING = "Stopping"
     STATUS_STOPPED = "Stopped"
 
-    def __init__(self, instance_id, client=None):
-        ServiceResource.__init__(self, 'ecs-instance', client=client)
-        self.instance_id = instance_id
-        self.region_id = None
-        self.inner_ip_address = None
-        self.creation_time = None
-        self.expired_time = None
-        self.io_optimized = None
-        self.public_ip_address = None
-        self.internet_charge_type = None
-        self.vpc_attributes = None
-        self.status = None
-        self.host_name = None
-        self.image_id = None
-        self.instance_charge_type = None
-        self.instance_network_type = None
-        self.instance_type = None
-        self.eip_address = None
-        self.serial_number = None
-        self.operation_locks = None
-        self.security_group_ids = None
-        self.internet_max_bandwidth_out = None
-        self.zone_id = None
-        self.instance_name = None
-        self.internet_max_bandwidth_in = None
-        self.device_available = None
+    # rough durations of the usual transitions, in seconds
+    DEFAULT_POLL_STRATEGY = BackoffPollStrategy(expected_durations={
+        (STATUS_PENDING, STATUS_STOPPED): 20,
+        (STATUS_STARTING, STATUS_RUNNING): 20,
+        (STATUS_STOPPING, STATUS_STOPPED): 10,
+        (STATUS_STOPPING, STATUS_RUNNING): 30,
+    })
 
-    def set_instance_attributes(self, attrs):
+    # server key -> attribute name, for every key in _INSTANCE_KEYS
+    ATTRIBUTE_NAMES = dict((key, _to_attribute_name(key)) for key in _INSTANCE_KEYS)
+
+    # known attributes are slots and read as None until they are set; any
+    # other attribute from the server is kept in _extra_attributes
+    __slots__ = tuple(sorted(ATTRIBUTE_NAMES.values())) + ('_extra_attributes',)
+    _KNOWN_ATTRIBUTES = frozenset(ATTRIBUTE_NAMES.values())
+
+    # attribute name -> server key
+    SERVER_KEYS = dict((name, key) for key, name in iteritems(ATTRIBUTE_NAMES))
+
+    def __init__(self, instance_id, client=None, **options):
+        ServiceResource.__init__(self, 'ecs-instance', client=client, **options)
+        self._extra_attributes = None
+        self.instance_id = instance_id
 
-        def convert(name):
-            # covert name from camel case to snake case
-            # e.g: InstanceName -> instance_name
-            s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-            return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+    def __getattr__(self, name):
+        # only called when an attribute is not found the usual way
+        if name in self._KNOWN_ATTRIBUTES:
+            return None
+        if name != '_extra_attributes' and self._extra_attributes \
+                and name in self._extra_attributes:
+            return self._extra_attributes[name]
+        raise AttributeError("'{0}' object has no attribute '{1}'".format(
+            self.__class__.__name__, name))
 
+    def set_instance_attributes(self, attrs):
+        attribute_names = self.ATTRIBUTE_NAMES
         for key, value in iteritems(attrs):
-            setattr(self, convert(key), value)
+            name = attribute_names.get(key)
+            if name is not None:
+                setattr(self, name, value)
+                continue
+
+            name = _get_extra_attribute_name(key)
+            if name in self._KNOWN_ATTRIBUTES:
+                setattr(self, name, value)
+            else:
+                if self._extra_attributes is None:
+                    self._extra_attributes = {}
+                self._extra_attributes[name] = value
 
     def refresh(self):
         request = DescribeInstancesRequest()
@@ -80,18 +131,28 @@ class ECSInstanceResource(ServiceResource):
         attrs = self._get_respone(request, {}, keys=['Instances', 'Instance'])[0]
         self.set_instance_attributes(attrs)
 
-    def wait_until(self, target_status, timeout=120):
-        start_time = time.time()
-        while True:
-            end_time = time.time()
-            if end_time - start_time >= timeout:
-                raise Exception("Timed out: no {0} status after {1} seconds.".format(
-                    target_status, timeout))
+    def wait_until(self, target_status, timeout=120, poll_strategy=None):
+        """Poll the instance until it reaches target_status.
 
+        The delays between polls come from poll_strategy, by default
+        DEFAULT_POLL_STRATEGY. No sleep extends past the deadline, and the
+        deadline is checked again after the last poll returns.
+        """
+        poll_strategy = poll_strategy or self.DEFAULT_POLL_STRATEGY
+        deadline = time.time() + timeout
+        delays = None
+        while True:
             self.refresh()
             if self.status == target_status:
                 return
-            time.sleep(1)
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise Exception("Timed out: no {0} status after {1} seconds.".format(
+                    target_status, timeout))
+            if delays is None:
+                delays = poll_strategy.delays(self.status, target_status)
+            time.sleep(min(next(delays), remaining))
 
     def start(self):
         request = StartInstanceRequest()
@@ -116,63 +177,180 @@ class ECSInstanceResource(ServiceResource):
 
 class ECSResource(ServiceResource):
 
-    def __init__(self, client=None):
-        ServiceResource.__init__(self, 'ecs', client=client)
+    # the most instance ids DescribeInstances accepts in one request
+    MAX_INSTANCE_IDS_PER_REQUEST = 100
+    # the largest page size DescribeInstances accepts
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, client=None, **options):
+        ServiceResource.__init__(self, 'ecs', client=client, **options)
         self.instances = self._init_instances()
 
     def _init_instances(self):
+        return ResourceCollection(
+            self._describe_instances,
+            self._create_instance_from_data,
+            key_names=ECSInstanceResource.SERVER_KEYS,
+            known_keys=ECSInstanceResource.ATTRIBUTE_NAMES,
+            required_keys=['InstanceId'],
+            server_filter=self._get_server_filter,
+            max_page_size=self.MAX_PAGE_SIZE,
+        )
 
-        def _handle_instance_ids(params):
-            instance_ids_to_add = []
-
-            if 'instance_id' in params:
-                instance_ids_to_add = [params['instance_id']]
-                del params['instance_id']
-
-            if 'instance_ids' in params:
-                instance_ids_to_add = params['instance_ids']
-                del params['instance_ids']
-
-            if instance_ids_to_add:
-                instance_ids = []
-                if 'InstanceIds' in params:
-                    instance_ids = json.loads(params['InstanceIds'])
-                instance_ids.extend(instance_ids_to_add)
-                params['InstanceIds'] = json.dumps(instance_ids)
-
-        def describe_instances_handler(params):
-            request = DescribeInstancesRequest()
-            _handle_instance_ids(params)
-            response = self._do_request(request, params)
-            self._check_server_response(response, 'TotalCount')
-            self._check_server_response(response, 'PageSize')
-            self._check_server_response(response, 'PageNumber')
-            self._check_server_response(response, 'Instances')
-            self._check_server_response(response['Instances'], 'Instance')
-            return (
-                response['TotalCount'],
-                response['PageSize'],
-                response['PageNumber'],
-                response['Instances']['Instance'],
-            )
-
-        def instance_creator(instance_data):
-            self._check_server_response(instance_data, 'InstanceId')
-            instance_id = instance_data['InstanceId']
-            del instance_data['InstanceId']
-            inst = ECSInstanceResource(instance_id, client=self._client)
-            inst.set_instance_attributes(instance_data)
-            return inst
+    @staticmethod
+    def _get_server_filter(key, value):
+        # how DescribeInstances filters on key on the server side, if it can
+        if key == 'InstanceId':
+            return 'instance_id', value
+        if key == 'InstanceIds' and not isinstance(value, string_types):
+            return 'instance_ids', value
+        if key == 'Tags' and isinstance(value, dict):
+            value = [{'Key': k, 'Value': v} for k, v in sorted(iteritems(value))]
+        if hasattr(DescribeInstancesRequest, 'set_' + key):
+            return key, value
 
-        return ResourceCollection(
-            describe_instances_handler,
-            instance_creator,
+    @staticmethod
+    def _handle_instance_ids(params):
+        instance_ids_to_add = []
+
+        if 'instance_id' in params:
+            instance_ids_to_add = [params['instance_id']]
+            del params['instance_id']
+
+        if 'instance_ids' in params:
+            instance_ids_to_add = params['instance_ids']
+            del params['instance_ids']
+
+        if instance_ids_to_add:
+            instance_ids = []
+            if 'InstanceIds' in params:
+                instance_ids = json.loads(params['InstanceIds'])
+            instance_ids.extend(instance_ids_to_add)
+            params['InstanceIds'] = json.dumps(instance_ids)
+
+    @classmethod
+    def _parse_instances_page(cls, response):
+        cls._check_server_response(response, 'TotalCount')
+        cls._check_server_response(response, 'PageSize')
+        cls._check_server_response(response, 'PageNumber')
+        cls._check_server_response(response, 'Instances')
+        cls._check_server_response(response['Instances'], 'Instance')
+        return (
+            response['TotalCount'],
+            response['PageSize'],
+            response['PageNumber'],
+            response['Instances']['Instance'],
         )
 
+    def _describe_instances(self, params):
+        request = DescribeInstancesRequest()
+        self._handle_instance_ids(params)
+        response = self._do_request(request, params)
+        return self._parse_instances_page(response)
+
+    def _new_instance_resource(self, instance_id):
+        return ECSInstanceResource(instance_id, client=self._client, **self._get_options())
+
+    def _create_instance_from_data(self, instance_data):
+        self._check_server_response(instance_data, 'InstanceId')
+        instance_id = instance_data['InstanceId']
+        del instance_data['InstanceId']
+        inst = self._new_instance_resource(instance_id)
+        inst.set_instance_attributes(instance_data)
+        return inst
+
+    def _describe_instances_by_ids(self, instance_ids):
+        request = DescribeInstancesRequest()
+        request.set_InstanceIds(json.dumps(instance_ids))
+        request.set_PageSize(len(instance_ids))
+        return self._get_respone(request, {}, keys=['Instances', 'Instance'])
+
+    @staticmethod
+    def _group_by_instance_id(instances):
+        instances_by_id = {}
+        for instance in instances:
+            instances_by_id.setdefault(instance.instance_id, []).append(instance)
+        return instances_by_id
+
+    def _chunk_instance_ids(self, instance_ids):
+        chunk_size = self.MAX_INSTANCE_IDS_PER_REQUEST
+        for i in range(0, len(instance_ids), chunk_size):
+            yield instance_ids[i:i + chunk_size]
+
+    def refresh_all(self, instances):
+        """Refresh many ECSInstanceResource objects in place.
+
+        One DescribeInstances call is made per MAX_INSTANCE_IDS_PER_REQUEST
+        distinct instance ids. Returns the instances that were not found,
+        e.g. because they have been deleted.
+        """
+        pending = self._group_by_instance_id(instances)
+        for instance_ids in self._chunk_instance_ids(list(pending)):
+            for attrs in self._describe_instances_by_ids(instance_ids):
+                for instance in pending.pop(attrs['InstanceId'], []):
+                    instance.set_instance_attributes(attrs)
+        return [instance for group in pending.values() for instance in group]
+
+    def _poll_pending_instances(self, pending, target_status, results, start_time):
+        for instance_ids in self._chunk_instance_ids(list(pending)):
+            for attrs in self._describe_instances_by_ids(instance_ids):
+                self._update_pending_instances(pending, attrs, target_status, results, start_time)
+
+    @staticmethod
+    def _update_pending_instances(pending, attrs, target_status, results, start_time):
+        instance_id = attrs['InstanceId']
+        if instance_id not in pending:
+            return
+        for instance in pending[instance_id]:
+            instance.set_instance_attributes(attrs)
+        if attrs.get('Status') == target_status:
+            results[instance_id] = time.time() - start_time
+            del pending[instance_id]
+
+    @staticmethod
+    def _get_pending_status(pending):
+        # the status shared by all pending instances, if there is one
+        statuses = set(group[0].status for group in pending.values())
+        if len(statuses) == 1:
+            return statuses.pop()
+
+    def wait_until_all(self, instances, target_status, timeout=120, poll_strategy=None):
+        """Wait until all instances reach target_status.
+
+        Every cycle polls all still pending instances with batched
+        DescribeInstances calls, and instances leave the set as soon as they
+        reach target_status. The delays between cycles come from
+        poll_strategy, as in ECSInstanceResource.wait_until. Returns a dict
+        that maps each instance id to the seconds it took to reach
+        target_status, or to None if it did not reach it within timeout.
+        """
+        poll_strategy = poll_strategy or ECSInstanceResource.DEFAULT_POLL_STRATEGY
+        start_time = time.time()
+        deadline = start_time + timeout
+        delays = None
+        results = {}
+        pending = self._group_by_instance_id(instances)
+        while pending:
+            self._poll_pending_instances(pending, target_status, results, start_time)
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+            if delays is None:
+                delays = poll_strategy.delays(self._get_pending_status(pending), target_status)
+            time.sleep(min(next(delays), remaining))
+
+        for instance_id in pending:
+            results[instance_id] = None
+        return results
+
+    def sync_inventory(self, inventory, full=False, full_sync_interval=None):
+        """Sync an alibabacloud.services.ecs_inventory.ECSInventory."""
+        return inventory.sync(self, full=full, full_sync_interval=full_sync_interval)
+
     def create_instance(self, **params):
         request = CreateInstanceRequest()
         instance_id = self._get_respone(request, params, key='InstanceId')
-        return ECSInstanceResource(instance_id, client=self._client)
+        return self._new_instance_resource(instance_id)
 
     def run_instances(self, **params):
         request = RunInstancesRequest()
@@ -180,6 +358,81 @@ class ECSResource(ServiceResource):
 
         instances = []
         for instance_id in instance_ids:
-            instance = ECSInstanceResource(instance_id, client=self._client)
+            instance = self._new_instance_resource(instance_id)
             instances.append(instance)
         return instances
+
+
+class MultiRegionECSResource(object):
+    """ECS in several regions at once, with one ECSResource per region.
+
+    `instances` scans all the regions concurrently, see MultiRegionCollection.
+    Every instance keeps the client of its region, so its actions, and the
+    bulk actions of the collection, go to the right region.
+
+    :param clients: one client per region
+    """
+
+    def __init__(self, clients, **options):
+        if not clients:
+            raise ValueError("At least one region is required.")
+        # every region shares one list of observers
+        if options.get('observers') is None:
+            options['observers'] = []
+        self._observers = options['observers']
+        self.region_ids = []
+        self.resources = {}
+        for client in clients:
+            region_id = client.get_region_id()
+            self.region_ids.append(region_id)
+            self.resources[region_id] = ECSResource(client, **options)
+        self.instances = MultiRegionCollection(
+            [(region_id, self.resources[region_id].instances) for region_id in self.region_ids])
+
+    def add_observer(self, observer):
+        """Register a RequestObserver for the requests of every region."""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
+
+    def get_region(self, region_id):
+        """Return the ECSResource of one region."""
+        return self.resources[region_id]
+
+    def _group_by_region(self, instances):
+        instances_by_region = {}
+        for instance in instances:
+            region_id = instance._client.get_region_id()
+            instances_by_region.setdefault(region_id, []).append(instance)
+        return instances_by_region
+
+    def _map_regions(self, instances, method_name, *args):
+        # run method_name of each regional resource on its own instances
+        instances_by_region = self._group_by_region(instances)
+        executor = ThreadPoolExecutor(max_workers=max(len(instances_by_region), 1))
+        try:
+            futures = [executor.submit(getattr(self.resources[region_id], method_name),
+                                       region_instances, *args)
+                       for region_id, region_instances in iteritems(instances_by_region)]
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False)
+
+    def refresh_all(self, instances):
+        """Refresh instances of any region, see ECSResource.refresh_all."""
+        not_found = []
+        for region_not_found in self._map_regions(instances, 'refresh_all'):
+            not_found.extend(region_not_found)
+        return not_found
+
+    def wait_until_all(self, instances, target_status, timeout=120, poll_strategy=None):
+        """Wait for instances of any region, see ECSResource.wait_until_all.
+
+        The regions are polled concurrently.
+        """
+        results = {}
+        for region_results in self._map_regions(instances, 'wait_until_all', target_status,
+                                                timeout, poll_strategy):
+            results.update(region_results)
+        return results
@@ -0,0 +1,182 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A local, persistent inventory of ECS instances backed by SQLite."""
+
+import json
+import sqlite3
+import time
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS instances (
+    instance_id TEXT NOT NULL,
+    region_id TEXT NOT NULL,
+    zone_id TEXT,
+    instance_type TEXT,
+    status TEXT,
+    creation_time TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (region_id, instance_id)
+);
+CREATE INDEX IF NOT EXISTS instances_instance_id ON instances (instance_id);
+CREATE INDEX IF NOT EXISTS instances_zone_id ON instances (zone_id);
+CREATE INDEX IF NOT EXISTS instances_instance_type ON instances (instance_type);
+CREATE INDEX IF NOT EXISTS instances_status ON instances (status);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+_INDEXED_COLUMNS = ('region_id', 'zone_id', 'instance_type', 'status')
+
+STATUSES = ('Pending', 'Running', 'Starting', 'Stopping', 'Stopped')
+TRANSITIONAL_STATUSES = ('Pending', 'Starting', 'Stopping')
+
+# how far before the last sync the creation time filter starts, against
+# clock skew and the minute precision of creation times, in seconds
+CREATION_TIME_MARGIN = 300
+
+
+def _format_creation_time(timestamp):
+    return time.strftime('%Y-%m-%dT%H:%MZ', time.gmtime(timestamp))
+
+
+class ECSInventory(object):
+    """A local copy of the instances of an account, kept up to date with sync().
+
+    Each sync covers the region of the ECSResource it is given: what it
+    deletes, the counts it compares and the sync times all belong to that
+    region, so one inventory can hold several regions. A full sync scans
+    every instance. An incremental sync first fetches the instances created
+    since the last sync, with a CreationStartTime filter. It then asks, for
+    every status, how many instances the server has in it with one request
+    with PageSize=1, and only rescans the statuses whose count differs from
+    the local one, plus the transitional ones. Instances that swapped
+    between settled statuses without changing any count are only picked up
+    by a full sync, see full_sync_interval in sync().
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _get_state(self, name):
+        row = self._conn.execute('SELECT value FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return json.loads(row['value']) if row else None
+
+    def _set_state(self, name, value):
+        self._conn.execute('INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)',
+                           (name, json.dumps(value)))
+
+    def get_last_sync_time(self, region_id):
+        return self._get_state('last_sync_time:' + region_id)
+
+    def get_last_full_sync_time(self, region_id):
+        return self._get_state('last_full_sync_time:' + region_id)
+
+    def _upsert(self, items, region_id, synced_at):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO instances (instance_id, region_id, zone_id, instance_type, '
+            'status, creation_time, data, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(item['InstanceId'], region_id, item.get('ZoneId'),
+              item.get('InstanceType'), item.get('Status'), item.get('CreationTime'),
+              json.dumps(item), synced_at) for item in items])
+
+    def _scan(self, collection, region_id, synced_at):
+        for page in collection.page_size(100).pages(raw=True):
+            self._upsert(page, region_id, synced_at)
+
+    @staticmethod
+    def _get_total_count(ecs, status):
+        return ecs.instances.filter(Status=status).count()
+
+    def sync(self, ecs, full=False, full_sync_interval=None):
+        """Bring the inventory up to date with the instances of an ECSResource.
+
+        The first sync is always a full one, and so is every sync that comes
+        full_sync_interval seconds or more after the last full one. Returns
+        the statuses that were rescanned, or None after a full sync.
+        """
+        region_id = ecs._client.get_region_id()
+        synced_at = time.time()
+        last_full_sync_time = self.get_last_full_sync_time(region_id)
+        full = full or last_full_sync_time is None or (
+            full_sync_interval is not None
+            and synced_at - last_full_sync_time >= full_sync_interval)
+        with self._conn:
+            if full:
+                self._scan(ecs.instances.all(), region_id, synced_at)
+                self._conn.execute('DELETE FROM instances WHERE region_id = ? AND synced_at < ?',
+                                   (region_id, synced_at))
+                self._set_state('last_full_sync_time:' + region_id, synced_at)
+                rescanned = None
+            else:
+                since = self.get_last_sync_time(region_id) - CREATION_TIME_MARGIN
+                self._scan(ecs.instances.filter(
+                    Filter1Key='CreationStartTime', Filter1Value=_format_creation_time(since)),
+                    region_id, synced_at)
+                # the new instances are counted locally from here on
+                rescanned = []
+                for status in STATUSES:
+                    if status in TRANSITIONAL_STATUSES or self._get_total_count(ecs, status) != \
+                            self.count(region_id=region_id, status=status):
+                        rescanned.append(status)
+                for status in rescanned:
+                    self._scan(ecs.instances.filter(Status=status), region_id, synced_at)
+                    # what was in the status before and is no longer listed
+                    # there either changed status or was deleted
+                    self._conn.execute(
+                        'DELETE FROM instances WHERE region_id = ? AND status = ? '
+                        'AND synced_at < ?', (region_id, status, synced_at))
+            self._set_state('last_sync_time:' + region_id, synced_at)
+        return rescanned
+
+    def _select(self, columns, criteria):
+        where = []
+        args = []
+        for name in _INDEXED_COLUMNS:
+            value = criteria.pop(name, None)
+            if value is not None:
+                where.append('{0} = ?'.format(name))
+                args.append(value)
+        if criteria:
+            raise ValueError("Unknown inventory criteria: {0}.".format(
+                ', '.join(sorted(criteria))))
+        sql = 'SELECT {0} FROM instances'.format(columns)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        return self._conn.execute(sql, args)
+
+    def get(self, instance_id, region_id=None):
+        """Return the instance dict of instance_id, or None."""
+        sql = 'SELECT data FROM instances WHERE instance_id = ?'
+        args = [instance_id]
+        if region_id is not None:
+            sql += ' AND region_id = ?'
+            args.append(region_id)
+        row = self._conn.execute(sql, args).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def find(self, **criteria):
+        """Return the instance dicts matching region_id, zone_id, instance_type and status."""
+        return [json.loads(row['data']) for row in self._select('data', criteria)]
+
+    def count(self, **criteria):
+        return self._select('COUNT(*)', criteria).fetchone()[0]
@@ -0,0 +1,187 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Scan throughput, hydration cost, peak memory and wait_until latency against a local fake ECS.
+
+Every fleet size gets its own tests.fake_ecs_server process, so the server
+neither competes for the GIL nor shows up in the memory numbers. Results
+are saved as JSON; --compare prints the change against an earlier run.
+
+    python -m benchmarks.bench_ecs [--sizes 1000 10000 100000] [--latency 0]
+        [--output FILE] [--compare FILE]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from alibabacloud.resources.metrics import RequestMetrics
+from alibabacloud.resources.waiter import FixedPollStrategy
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs_server import make_client
+
+
+class ServerProcess(object):
+    """A fake ECS server in a child process, for use in a with statement."""
+
+    def __init__(self, **options):
+        self._args = [sys.executable, '-m', 'tests.fake_ecs_server']
+        for key, value in sorted(options.items()):
+            self._args += ['--' + key.replace('_', '-'), str(value)]
+        self._process = None
+        self.port = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(self._args, stdout=subprocess.PIPE)
+        self.port = int(self._process.stdout.readline())
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._process.terminate()
+        self._process.wait()
+        self._process.stdout.close()
+
+    def make_resource(self):
+        metrics = RequestMetrics()
+        return ECSResource(make_client('127.0.0.1', self.port), observers=[metrics]), metrics
+
+
+def _request_count(metrics, action_name=None):
+    actions = metrics.to_dict()
+    if action_name is not None:
+        return actions.get(action_name, {}).get('count', 0)
+    return sum(action['count'] for action in actions.values())
+
+
+def bench_scan(ecs, metrics, size, results):
+    metrics.reset()
+    start = time.perf_counter()
+    count = len(list(ecs.instances.page_size(100)))
+    elapsed = time.perf_counter() - start
+    assert count == size, (count, size)
+    results['scan.{0}.seconds'.format(size)] = elapsed
+    results['scan.{0}.instances_per_second'.format(size)] = size / elapsed
+    results['scan.{0}.requests'.format(size)] = _request_count(metrics)
+
+    start = time.perf_counter()
+    for item in ecs.instances.page_size(100).raw():
+        pass
+    results['raw_scan.{0}.seconds'.format(size)] = time.perf_counter() - start
+
+
+def bench_hydration(ecs, size, results):
+    items = list(ecs.instances.page_size(100).raw())
+    # hydration consumes the InstanceId key, so every run works on copies
+    copies = [dict(item) for item in items]
+    start = time.perf_counter()
+    for item in copies:
+        ecs._create_instance_from_data(item)
+    elapsed = time.perf_counter() - start
+    results['hydration.{0}.us_per_instance'.format(size)] = elapsed / size * 1e6
+
+
+def bench_memory(ecs, size, results):
+    tracemalloc.start()
+    instances = list(ecs.instances.page_size(100))
+    results['memory.{0}.instances_peak_mib'.format(size)] = \
+        tracemalloc.get_traced_memory()[1] / 2.0 ** 20
+    del instances
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    for item in ecs.instances.page_size(100).raw():
+        pass
+    results['memory.{0}.raw_stream_peak_mib'.format(size)] = \
+        tracemalloc.get_traced_memory()[1] / 2.0 ** 20
+    tracemalloc.stop()
+
+
+def bench_wait_until(latency, results, transition_time=1.0, fleet_size=100):
+    # the overshoot is how long after the transition the waiter noticed it
+    with ServerProcess(fleet_size=fleet_size, latency=latency,
+                       transition_time=transition_time) as server:
+        ecs, metrics = server.make_resource()
+        for name, poll_strategy in (('backoff', None), ('fixed_0.1', FixedPollStrategy(0.1))):
+            instance = list(ecs.instances.filter(status='Running').limit(1))[0]
+            metrics.reset()
+            start = time.perf_counter()
+            instance.stop()
+            instance.wait_until('Stopped', poll_strategy=poll_strategy)
+            key = 'wait_until.{0}'.format(name)
+            results[key + '.overshoot_seconds'] = time.perf_counter() - start - transition_time
+            results[key + '.requests'] = _request_count(metrics, 'DescribeInstances')
+
+            instances = list(ecs.instances.filter(status='Running'))
+            ecs.instances.filter(status='Running').stop()
+            # from the last stop on, the transition takes transition_time
+            metrics.reset()
+            start = time.perf_counter()
+            ecs.wait_until_all(instances, 'Stopped', poll_strategy=poll_strategy)
+            key = 'wait_until_all.{0}'.format(name)
+            results[key + '.overshoot_seconds'] = time.perf_counter() - start - transition_time
+            results[key + '.requests'] = _request_count(metrics, 'DescribeInstances')
+            ecs.instances.filter(status='Stopped').start()
+            ecs.wait_until_all(list(ecs.instances.all()), 'Running', poll_strategy=poll_strategy)
+
+
+def compare(results, previous):
+    print('{0:<48} {1:>14} {2:>14} {3:>9}'.format('metric', 'previous', 'current', 'change'))
+    for key in sorted(results):
+        if key not in previous:
+            continue
+        old, new = previous[key], results[key]
+        change = '{0:+.1f}%'.format((new - old) / old * 100) if old else ''
+        print('{0:<48} {1:>14.4f} {2:>14.4f} {3:>9}'.format(key, old, new, change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--latency', type=float, default=0,
+                        help='server latency per request, in seconds')
+    parser.add_argument('--output', default=time.strftime('bench_ecs-%Y%m%d-%H%M%S.json'))
+    parser.add_argument('--compare', help='the output of an earlier run')
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        with ServerProcess(fleet_size=size, latency=args.latency) as server:
+            ecs, metrics = server.make_resource()
+            bench_scan(ecs, metrics, size, results)
+            bench_hydration(ecs, size, results)
+            bench_memory(ecs, size, results)
+        print('{0} instances: {1:.0f} instances/s, {2:.2f} us hydration, {3:.1f} MiB peak'.format(
+            size, results['scan.{0}.instances_per_second'.format(size)],
+            results['hydration.{0}.us_per_instance'.format(size)],
+            results['memory.{0}.instances_peak_mib'.format(size)]))
+    bench_wait_until(args.latency, results)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sizes': args.sizes,
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+    print('results saved to {0}'.format(args.output))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
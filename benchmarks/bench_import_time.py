@@ -0,0 +1,66 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Import time and module count of the alibabacloud package, each in a fresh interpreter.
+
+"eager" imports the ECS service module as alibabacloud/__init__.py did
+before the lazy service registry; "first use" also creates an ECS resource.
+
+    python -m benchmarks.bench_import_time [--repeat 20]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = [
+    ('import alibabacloud', 'import alibabacloud'),
+    ('eager', 'import alibabacloud, alibabacloud.services.ecs'),
+    ('first use', "import alibabacloud; alibabacloud.get_resource('ecs', 'ak', 'secret', "
+                  "'cn-hangzhou')"),
+]
+
+SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+{0}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, len(sys.modules)]))
+"""
+
+
+def measure(statement, repeat):
+    timings = []
+    module_count = 0
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT.format(statement)])
+        elapsed, module_count = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        timings.append(elapsed)
+    return statistics.median(timings), min(timings), module_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print('{0:<20} {1:>12} {2:>10} {3:>9}'.format('scenario', 'median ms', 'min ms', 'modules'))
+    for name, statement in SCENARIOS:
+        median, best, module_count = measure(statement, args.repeat)
+        print('{0:<20} {1:>12.1f} {2:>10.1f} {3:>9}'.format(
+            name, median * 1000, best * 1000, module_count))
+
+
+if __name__ == '__main__':
+    main()
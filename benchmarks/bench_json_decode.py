@@ -0,0 +1,72 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Parse time and peak memory of one DescribeInstances page per JSON decoder.
+
+"baseline" is what ServiceResource._do_request did before the decoder layer:
+decode the body to str, then json.loads it.
+
+    python -m benchmarks.bench_json_decode [--page-size 100] [--repeat 200]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from alibabacloud.resources import decoder
+from tests.fake_ecs import make_instance_data
+
+
+def make_page(page_size):
+    return json.dumps({
+        'RequestId': 'fake-request-id',
+        'TotalCount': page_size,
+        'PageNumber': 1,
+        'PageSize': page_size,
+        'Instances': {'Instance': [make_instance_data(i) for i in range(page_size)]},
+    }).encode('utf-8')
+
+
+def measure(loads, body, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        loads(body)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    loads(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    body = make_page(args.page_size)
+    candidates = [('baseline', lambda data: json.loads(data.decode('utf-8')))]
+    candidates += [(name, decoder.get_decoder(name)) for name in decoder.available_decoders()]
+
+    print('page of {0} instances, {1} bytes, default decoder: {2}'.format(
+        args.page_size, len(body), decoder.get_default_decoder_name()))
+    print('{0:<10} {1:>12} {2:>14}'.format('decoder', 'ms / page', 'peak KiB'))
+    for name, loads in candidates:
+        elapsed, peak = measure(loads, body, args.repeat)
+        print('{0:<10} {1:>12.3f} {2:>14.1f}'.format(name, elapsed * 1000, peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Time full instance scans replayed from a recording, without network or API quota.
+
+The recording must hold a full scan with the same page size, e.g. one made
+with alibabacloud.replay.RecordingClient against production. Without a
+recording, one is made from a fake fleet first.
+
+    python -m benchmarks.bench_replay [--recording FILE] [--fleet-size 10000]
+        [--page-size 100] [--repeat 5] [--speed SPEED]
+"""
+import argparse
+import time
+
+from alibabacloud.replay import RecordingClient, ReplayClient, load_records
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recording')
+    parser.add_argument('--fleet-size', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--speed', type=float, default=None,
+                        help='1 replays the recorded latencies, by default there is none')
+    args = parser.parse_args()
+
+    if args.recording:
+        records = load_records(args.recording)
+    else:
+        client = RecordingClient(FakeECSClient(args.fleet_size))
+        list(ECSResource(client).instances.page_size(args.page_size).raw())
+        records = client.records
+
+    timings = []
+    for i in range(args.repeat):
+        ecs = ECSResource(ReplayClient(records, speed=args.speed))
+        start = time.perf_counter()
+        count = len(list(ecs.instances.page_size(args.page_size)))
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print('{0} instances from {1} records: best {2:.1f} ms / scan, {3:.2f} us / instance'.format(
+        count, len(records), best * 1000, best / max(count, 1) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -19,8 +19,10 @@ PACKAGE = "alibabacloud"
 VERSION = "0.1.1"
 
 requires = [
-    'aliyun-python-sdk-core',
+    # pool_size of AcsClient, used by ClientRegistry, came with 2.13.33
+    'aliyun-python-sdk-core>=2.13.33',
     'aliyun-python-sdk-ecs>=4.15.0',
+    'futures; python_version < "3"',
 ]
 
 setup(
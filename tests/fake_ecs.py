@@ -0,0 +1,266 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import time
+from collections import deque
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+
+# transitional status -> (status reached when the transition is over)
+TRANSITIONS = {
+    'Pending': 'Stopped',
+    'Starting': 'Running',
+    'Stopping': 'Stopped',
+}
+
+
+# the DescribeInstances parameters the fake filters on
+FILTER_KEYS = ('InstanceIds', 'Status', 'ZoneId', 'InstanceType', 'InstanceName',
+               'Filter.1.Key', 'Filter.2.Key', 'Filter.3.Key', 'Filter.4.Key')
+
+
+def _get_creation_time_range(params):
+    # the Filter.N.Key/Filter.N.Value pairs, of which the fake knows the
+    # creation time ones
+    filters = dict((params['Filter.{0}.Key'.format(n)], params.get('Filter.{0}.Value'.format(n)))
+                   for n in range(1, 5) if 'Filter.{0}.Key'.format(n) in params)
+    return filters.get('CreationStartTime'), filters.get('CreationEndTime')
+
+
+def make_instance_data(index, region_id='cn-hangzhou', zone_id=None, instance_type=None,
+                       status='Running', creation_time=None):
+    zone_id = zone_id or '{0}-{1}'.format(region_id, 'abcdef'[index % 6])
+    instance_type = instance_type or ('ecs.n2.small', 'ecs.n2.large')[index % 2]
+    return {
+        'InstanceId': 'i-{0:020d}'.format(index),
+        'InstanceName': 'instance-{0}'.format(index),
+        'RegionId': region_id,
+        'ZoneId': zone_id,
+        'InstanceType': instance_type,
+        'InstanceTypeFamily': instance_type.rsplit('.', 1)[0],
+        'Cpu': 1 + index % 4,
+        'Memory': 1024 * (1 + index % 8),
+        'Status': status,
+        'HostName': 'host-{0}'.format(index),
+        'ImageId': 'coreos_1745_7_0_64_30G_alibase_20180705.vhd',
+        'CreationTime': creation_time or '2018-07-{0:02d}T08:00Z'.format(1 + index % 28),
+        'ExpiredTime': '2099-12-31T15:59Z',
+        'InstanceChargeType': 'PostPaid',
+        'InternetChargeType': 'PayByTraffic',
+        'InternetMaxBandwidthIn': 200,
+        'InternetMaxBandwidthOut': index % 100,
+        'InstanceNetworkType': 'vpc',
+        'IoOptimized': True,
+        'DeviceAvailable': True,
+        'SerialNumber': '{0:08x}-0000-0000-0000-000000000000'.format(index),
+        'SecurityGroupIds': {'SecurityGroupId': ['sg-{0:012d}'.format(index % 3)]},
+        'PublicIpAddress': {'IpAddress': []},
+        'InnerIpAddress': {'IpAddress': []},
+        'EipAddress': {'AllocationId': '', 'IpAddress': '', 'InternetChargeType': ''},
+        'VpcAttributes': {
+            'VpcId': 'vpc-{0:012d}'.format(index % 5),
+            'VSwitchId': 'vsw-{0:012d}'.format(index % 7),
+            'NatIpAddress': '',
+            'PrivateIpAddress': {'IpAddress': ['10.0.{0}.{1}'.format(index // 250, index % 250)]},
+        },
+        'OperationLocks': {'LockReason': []},
+        'Tags': {'Tag': [{'TagKey': 'team', 'TagValue': 'team-{0}'.format(index % 4)}]},
+    }
+
+
+class FakeECSClient(object):
+    """An in-memory stand-in for AcsClient that serves a subset of the ECS API.
+
+    Lifecycle actions move instances into a transitional status that settles
+    after `transition_time` seconds. Every request waits `latency` seconds,
+    and with `throttle_rate` requests beyond that many per second fail with
+    a Throttling error. Every request is recorded in `calls`.
+    """
+
+    def __init__(self, fleet_size=0, region_id='cn-hangzhou', transition_time=0,
+                 latency=0, throttle_rate=None):
+        self._region_id = region_id
+        self._transition_time = transition_time
+        self._latency = latency
+        self._throttle_rate = throttle_rate
+        self._request_times = deque()
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._instances = []
+        self._transitions = {}
+        self._errors = {}
+        self.calls = []
+        for i in range(fleet_size):
+            self.add_instance()
+
+    def get_region_id(self):
+        return self._region_id
+
+    def add_instance(self, **kwargs):
+        with self._lock:
+            data = make_instance_data(self._next_index, region_id=self._region_id, **kwargs)
+            self._next_index += 1
+            self._instances.append(data)
+            return data['InstanceId']
+
+    def fail_next(self, action, error, times=1):
+        """Make the next `times` requests of action raise error."""
+        self._errors.setdefault(action, []).extend([error] * times)
+
+    def calls_of(self, action):
+        return [params for name, params in self.calls if name == action]
+
+    def _settle(self, data):
+        started = self._transitions.get(data['InstanceId'])
+        if started is not None and time.time() - started >= self._transition_time:
+            data['Status'] = TRANSITIONS[data['Status']]
+            del self._transitions[data['InstanceId']]
+
+    def _find(self, instance_id):
+        for data in self._instances:
+            if data['InstanceId'] == instance_id:
+                self._settle(data)
+                return data
+        raise ServerException('InvalidInstanceId.NotFound',
+                              'The specified InstanceId does not exist.', 404)
+
+    def _transit(self, instance_id, expected, transitional):
+        data = self._find(instance_id)
+        if data['Status'] not in expected:
+            raise ServerException(
+                'IncorrectInstanceStatus',
+                'The specified instance is in an incorrect status for the requested action.',
+                403)
+        data['Status'] = transitional
+        self._transitions[instance_id] = time.time()
+        if not self._transition_time:
+            self._settle(data)
+
+    def _check_throttling(self):
+        if self._throttle_rate is None:
+            return
+        now = time.time()
+        request_times = self._request_times
+        while request_times and now - request_times[0] >= 1:
+            request_times.popleft()
+        if len(request_times) >= self._throttle_rate:
+            raise ServerException('Throttling', 'Request was denied due to request throttling.',
+                                  400)
+        request_times.append(now)
+
+    def do_action_with_exception(self, request):
+        return self.handle_action(request.get_action_name(), dict(request.get_query_params()))
+
+    def handle_action(self, action, params):
+        """Serve one request: return the JSON body or raise a ServerException."""
+        if self._latency:
+            time.sleep(self._latency)
+        with self._lock:
+            self.calls.append((action, params))
+            if self._errors.get(action):
+                raise self._errors[action].pop(0)
+            self._check_throttling()
+            handler = getattr(self, '_handle_' + action, None)
+            if handler is None:
+                raise ServerException('InvalidAction.NotFound',
+                                      'The specified action is not supported.', 404)
+            return json.dumps(handler(params)).encode('utf-8')
+
+    def _handle_DescribeInstances(self, params):
+        page_number = int(params.get('PageNumber', 1))
+        page_size = int(params.get('PageSize', 10))
+        if page_size > 100:
+            raise ServerException('InvalidParameter',
+                                  'The specified parameter "PageSize" is not valid.', 400)
+
+        start = (page_number - 1) * page_size
+        if not any(key in params for key in FILTER_KEYS):
+            # only settle the page, so that scans of large fleets stay fast
+            page = self._instances[start:start + page_size]
+            for data in page:
+                self._settle(data)
+            return self._make_page(page, len(self._instances), page_number, page_size)
+
+        matched = []
+        instance_ids = json.loads(params['InstanceIds']) if 'InstanceIds' in params else None
+        start_time, end_time = _get_creation_time_range(params)
+        for data in self._instances:
+            self._settle(data)
+            if instance_ids is not None and data['InstanceId'] not in instance_ids:
+                continue
+            if start_time is not None and data['CreationTime'] < start_time or \
+                    end_time is not None and data['CreationTime'] > end_time:
+                continue
+            if any(key in params and params[key] != data[key]
+                   for key in ('Status', 'ZoneId', 'InstanceType', 'InstanceName')):
+                continue
+            matched.append(data)
+        return self._make_page(matched[start:start + page_size], len(matched), page_number,
+                               page_size)
+
+    @staticmethod
+    def _make_page(instances, total_count, page_number, page_size):
+        return {
+            'RequestId': 'fake-request-id',
+            'TotalCount': total_count,
+            'PageNumber': page_number,
+            'PageSize': page_size,
+            'Instances': {'Instance': instances},
+        }
+
+    def _handle_StartInstance(self, params):
+        self._transit(params['InstanceId'], ('Stopped',), 'Starting')
+        return {'RequestId': 'fake-request-id'}
+
+    def _handle_StopInstance(self, params):
+        self._transit(params['InstanceId'], ('Running',), 'Stopping')
+        return {'RequestId': 'fake-request-id'}
+
+    def _handle_RebootInstance(self, params):
+        self._transit(params['InstanceId'], ('Running',), 'Starting')
+        return {'RequestId': 'fake-request-id'}
+
+    def _handle_DeleteInstance(self, params):
+        data = self._find(params['InstanceId'])
+        if data['Status'] != 'Stopped':
+            raise ServerException(
+                'IncorrectInstanceStatus',
+                'The specified instance is in an incorrect status for the requested action.',
+                403)
+        self._instances.remove(data)
+        return {'RequestId': 'fake-request-id'}
+
+    def _new_instance(self, params, status='Pending'):
+        data = make_instance_data(self._next_index, region_id=self._region_id,
+                                  instance_type=params.get('InstanceType'), status=status,
+                                  creation_time=time.strftime('%Y-%m-%dT%H:%MZ', time.gmtime()))
+        self._next_index += 1
+        self._instances.append(data)
+        self._transitions[data['InstanceId']] = time.time()
+        if not self._transition_time:
+            self._settle(data)
+        return data['InstanceId']
+
+    def _handle_CreateInstance(self, params):
+        return {'RequestId': 'fake-request-id', 'InstanceId': self._new_instance(params)}
+
+    def _handle_RunInstances(self, params):
+        # RunInstances starts what it creates
+        instance_ids = [self._new_instance(params, status='Starting')
+                        for i in range(int(params.get('Amount', 1)))]
+        return {'RequestId': 'fake-request-id',
+                'InstanceIdSets': {'InstanceIdSet': instance_ids}}
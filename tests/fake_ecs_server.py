@@ -0,0 +1,156 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A local HTTP endpoint that serves the fake ECS API of tests.fake_ecs.
+
+Real AcsClient objects talk to it over HTTP, with signing, connection
+pooling and response parsing, so tests and benchmarks run hermetically.
+Run it in its own process with:
+
+    python -m tests.fake_ecs_server [--fleet-size 1000] [--port 0] [--latency 0]
+        [--transition-time 0] [--throttle-rate N]
+
+It prints the port it listens on, then serves until interrupted.
+"""
+import argparse
+import json
+import sys
+import threading
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+from aliyunsdkcore.client import AcsClient
+from aliyunsdkcore.vendored.six.moves import BaseHTTPServer, socketserver
+from aliyunsdkcore.vendored.six.moves.urllib.parse import parse_qsl, urlparse
+
+from tests.fake_ecs import FakeECSClient
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self):
+        params = dict(parse_qsl(urlparse(self.path).query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode('utf-8')))
+        action = params.pop('Action', None)
+        for key in ('Format', 'Version', 'AccessKeyId', 'Signature', 'SignatureMethod',
+                    'SignatureVersion', 'SignatureNonce', 'SignatureType', 'Timestamp',
+                    'RegionId'):
+            params.pop(key, None)
+
+        try:
+            status, body = 200, self.server.backend.handle_action(action, params)
+        except ServerException as e:
+            status = e.get_http_status()
+            body = json.dumps({'RequestId': 'fake-request-id', 'Code': e.get_error_code(),
+                               'Message': e.get_error_msg()}).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeECSServer(object):
+    """Serves a FakeECSClient over HTTP on host:port, port 0 picks a free one.
+
+    The keyword arguments configure the FakeECSClient, see its docstring.
+    Use it as a context manager, or call start() and stop().
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, **backend_options):
+        self.backend = FakeECSClient(**backend_options)
+        self._httpd = _ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.backend = self.backend
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def region_id(self):
+        return self.backend.get_region_id()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def make_client(self, **client_options):
+        return make_client(self.host, self.port, self.region_id, **client_options)
+
+
+def make_client(host, port, region_id='cn-hangzhou', **client_options):
+    """Return an AcsClient whose ECS requests go to a fake server."""
+    client_options.setdefault('auto_retry', False)
+    client = AcsClient('fake-access-key-id', 'fake-access-key-secret', region_id, port=port,
+                       **client_options)
+    client.add_endpoint(region_id, 'Ecs', host)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--region-id', default='cn-hangzhou')
+    parser.add_argument('--fleet-size', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--transition-time', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeECSServer(args.host, args.port, fleet_size=args.fleet_size,
+                           region_id=args.region_id, latency=args.latency,
+                           transition_time=args.transition_time,
+                           throttle_rate=args.throttle_rate)
+    print(server.port)
+    sys.stdout.flush()
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+import unittest
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+from alibabacloud.resources.async_base import DEFAULT_MAX_WORKERS
+from alibabacloud.resources.collection import ScanCursor
+from alibabacloud.services.async_ecs import AsyncECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+class AsyncECSResourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeECSClient(25)
+        self.ecs = AsyncECSResource(self.client)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_async_iteration(self):
+
+        async def collect(collection):
+            return [inst.instance_id async for inst in collection]
+
+        all_ids = self._run(collect(self.ecs.instances.page_size(10)))
+        self.assertEqual(['i-{0:020d}'.format(i) for i in range(25)], all_ids)
+        self.assertEqual(all_ids[:7], self._run(collect(self.ecs.instances.limit(7))))
+        self.assertEqual(13, len(self._run(collect(
+            self.ecs.instances.filter(InstanceType='ecs.n2.small')))))
+
+        async def collect_raw(collection):
+            return [item['InstanceId'] async for item in collection.raw()]
+
+        self.assertEqual(all_ids[:12], self._run(collect_raw(self.ecs.instances.limit(12))))
+
+        with self.assertRaises(TypeError):
+            list(self.ecs.instances.all())
+
+        self.assertEqual(25, self._run(self.ecs.instances.count()))
+        self.assertEqual(6, self._run(self.ecs.instances.filter(cpu=2).count()))
+        self.assertTrue(self._run(self.ecs.instances.filter(cpu__gte=4).exists()))
+        self.assertFalse(self._run(self.ecs.instances.filter(status='Stopped').exists()))
+
+        async def scan(collection, cursor):
+            return [inst.instance_id async for page in collection.scan(cursor, retry_delay=0)
+                    for inst in page]
+
+        cursor = ScanCursor()
+        self.client.fail_next('DescribeInstances', ServerException('InternalError', '', 500))
+        self.assertEqual(all_ids, self._run(scan(self.ecs.instances.page_size(10), cursor)))
+        self.assertEqual((4, 25, True), (cursor.next_page, cursor.items_seen, cursor.done))
+
+    def test_instance_lifecycle(self):
+
+        async def lifecycle():
+            instance = await self.ecs.create_instance(InstanceType='ecs.n2.small')
+            await instance.wait_until(instance.STATUS_STOPPED)
+            await instance.start()
+            await instance.wait_until(instance.STATUS_RUNNING)
+            await instance.stop()
+            await instance.refresh()
+            self.assertEqual(instance.STATUS_STOPPED, instance.status)
+            await instance.delete()
+
+        async def run_all():
+            await asyncio.gather(*[lifecycle() for i in range(20)])
+
+        self._run(run_all())
+        self.assertEqual(20, len(self.client.calls_of('DeleteInstance')))
+
+    def test_bulk_actions(self):
+        report = self._run(self.ecs.instances.filter(InstanceType='ecs.n2.small').stop())
+        self.assertEqual(13, len(report.succeeded))
+        report = self._run(self.ecs.instances.all().delete(max_workers=5))
+        self.assertEqual(13, len(report.succeeded))
+        self.assertEqual(12, len(report.failed))
+
+    def test_requests_run_on_a_dedicated_executor(self):
+        client = FakeECSClient(64, latency=0.05)
+        ecs = AsyncECSResource(client)
+
+        async def collect():
+            return [instance async for instance in ecs.instances.page_size(100)]
+
+        instances = self._run(collect())
+        executor = ecs._get_executor()
+        self.assertEqual(DEFAULT_MAX_WORKERS, executor._max_workers)
+        self.assertTrue(all(instance._executor is executor for instance in instances))
+        self.assertFalse(hasattr(instances[0], '__dict__'))
+
+        async def refresh_all():
+            await asyncio.gather(*[instance.refresh() for instance in instances])
+
+        start = time.time()
+        self._run(refresh_all())
+        # two rounds of DEFAULT_MAX_WORKERS concurrent requests
+        self.assertLess(time.time() - start, 0.05 * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
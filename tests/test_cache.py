@@ -0,0 +1,177 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest
+
+from aliyunsdkcore.client import AcsClient
+from aliyunsdkecs.request.v20140526.DescribeInstancesRequest import DescribeInstancesRequest
+
+from alibabacloud.resources.cache import ResponseCache, SingleFlight, make_request_key
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeECSClient(30)
+        self.cache = ResponseCache(ttl=60, max_size=4)
+        self.ecs = ECSResource(self.client, cache=self.cache)
+
+    def _describe_count(self):
+        return len(self.client.calls_of('DescribeInstances'))
+
+    def test_read_only_calls_are_cached(self):
+        instance = list(self.ecs.instances.filter(InstanceType='ecs.n2.small').limit(1))[0]
+        self.assertEqual(1, self._describe_count())
+        instance.refresh()
+        instance.refresh()
+        self.assertEqual(2, self._describe_count())
+        list(self.ecs.instances.filter(InstanceType='ecs.n2.small').limit(1))
+        self.assertEqual(2, self._describe_count())
+        self.assertEqual({'hits': 2, 'misses': 2, 'evictions': 0, 'size': 2}, self.cache.stats())
+
+    def test_mutations_invalidate(self):
+        instances = list(self.ecs.instances.limit(2))
+        for instance in instances:
+            instance.refresh()
+        self.assertEqual(3, self.cache.stats()['size'])
+
+        instances[0].stop()
+        # the listing and the entry of the stopped instance are gone
+        self.assertEqual(1, self.cache.stats()['size'])
+        instances[0].refresh()
+        self.assertEqual(instances[0].STATUS_STOPPED, instances[0].status)
+        instances[1].refresh()
+        self.assertEqual(1, self.cache.stats()['hits'])
+
+        self.ecs.create_instance(InstanceType='ecs.n2.small')
+        self.assertEqual(2, self.cache.stats()['size'])
+
+    def test_ttl_and_lru(self):
+        self.cache.ttl = 0.1
+        instances = list(self.ecs.instances.limit(5))
+        for instance in instances:
+            instance.refresh()
+        self.assertEqual(4, self.cache.stats()['size'])
+        self.assertEqual(2, self.cache.stats()['evictions'])
+
+        time.sleep(0.1)
+        instances[-1].refresh()
+        self.assertEqual(0, self.cache.stats()['hits'])
+
+    def test_reads_sent_before_an_invalidation_are_not_cached(self):
+        instance = list(self.ecs.instances.limit(1))[0]
+        describe = self.client.do_action_with_exception
+
+        def describe_then_stop(request):
+            # the instance is stopped while the response is on its way back
+            response = describe(request)
+            self.client.do_action_with_exception = describe
+            instance.stop()
+            return response
+
+        self.client.do_action_with_exception = describe_then_stop
+        instance.refresh()
+        self.assertEqual(instance.STATUS_RUNNING, instance.status)
+        self.assertEqual(0, self.cache.stats()['size'])
+        instance.refresh()
+        self.assertEqual(instance.STATUS_STOPPED, instance.status)
+
+    def test_accounts_do_not_share_entries(self):
+        other_client = FakeECSClient(0)
+        other_ecs = ECSResource(other_client, cache=self.cache)
+        self.assertEqual(30, self.ecs.instances.count())
+        self.assertEqual(0, other_ecs.instances.count())
+        self.assertEqual(1, len(other_client.calls_of('DescribeInstances')))
+
+        # clients with access keys are told apart by them
+        clients = [AcsClient('ak-a', 'secret', 'cn-hangzhou'),
+                   AcsClient('ak-a', 'secret', 'cn-hangzhou'),
+                   AcsClient('ak-b', 'secret', 'cn-hangzhou')]
+        request = DescribeInstancesRequest()
+        keys = [make_request_key('cn-hangzhou', request, client) for client in clients]
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_identical_requests_are_coalesced(self):
+        client = FakeECSClient(30, latency=0.2)
+        single_flight = SingleFlight()
+        ecs = ECSResource(client, single_flight=single_flight)
+        instance = list(ecs.instances.limit(1))[0]
+        client.calls = []
+
+        threads = [threading.Thread(target=instance.refresh) for i in range(10)]
+        threads += [threading.Thread(
+            target=lambda: list(ecs.instances.filter(Status='Running').page_size(10)))
+            for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # one refresh, and one request per page of the listing
+        self.assertEqual(1 + 3, len(client.calls_of('DescribeInstances')))
+        self.assertEqual(9 + 9 * 3, single_flight.shared)
+
+    def test_accounts_do_not_share_requests(self):
+        clients = [FakeECSClient(3, latency=0.2), FakeECSClient(0, latency=0.2)]
+        single_flight = SingleFlight()
+        counts = {}
+
+        def count(client):
+            ecs = ECSResource(client, single_flight=single_flight)
+            counts[id(client)] = ecs.instances.count()
+
+        threads = [threading.Thread(target=count, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([3, 0], [counts[id(client)] for client in clients])
+        self.assertEqual(0, single_flight.shared)
+
+    def test_errors_are_shared(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('boom')
+
+        def call():
+            try:
+                single_flight.do('key', fail)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+        self.assertEqual(2, len(errors))
+        self.assertEqual(1, single_flight.shared)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+import alibabacloud
+from alibabacloud.clients import ClientRegistry, get_default_registry
+from alibabacloud.resources.throttling import RetryPolicy
+
+
+class ClientRegistryTest(unittest.TestCase):
+
+    def test_clients_are_shared_per_credentials_and_region(self):
+        registry = ClientRegistry(pool_size=4)
+        client = registry.get_client('ak', 'secret', 'cn-hangzhou')
+        self.assertIs(client, registry.get_client('ak', 'secret', 'cn-hangzhou'))
+        self.assertIsNot(client, registry.get_client('ak', 'secret', 'cn-beijing'))
+        self.assertIsNot(client, registry.get_client('ak2', 'secret', 'cn-hangzhou'))
+        self.assertIsNot(client, registry.get_client('ak', 'secret', 'cn-hangzhou', timeout=3))
+        self.assertEqual((4, 1), (registry.created, registry.reused))
+        self.assertEqual(4, client.session.get_adapter('https://').poolmanager.connection_pool_kw[
+            'maxsize'])
+
+    def test_least_recently_used_client_is_dropped(self):
+        registry = ClientRegistry(max_clients=2, client_factory=lambda *args, **kwargs: object())
+        first = registry.get_client('ak', 'secret', 'cn-hangzhou')
+        registry.get_client('ak', 'secret', 'cn-beijing')
+        registry.get_client('ak', 'secret', 'cn-hangzhou')
+        registry.get_client('ak', 'secret', 'us-west-1')
+        self.assertEqual(2, len(registry))
+        self.assertIs(first, registry.get_client('ak', 'secret', 'cn-hangzhou'))
+        registry.clear()
+        self.assertEqual(0, len(registry))
+
+    def test_concurrent_handout(self):
+        registry = ClientRegistry(client_factory=lambda *args, **kwargs: object())
+        clients = []
+
+        def get_client():
+            clients.append(registry.get_client('ak', 'secret', 'cn-hangzhou'))
+
+        threads = [threading.Thread(target=get_client) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, len(set(id(client) for client in clients)))
+        self.assertEqual(1, registry.created)
+
+    def test_get_resource_reuses_clients(self):
+        ecs = alibabacloud.get_resource('ecs', 'ak', 'secret', 'cn-hangzhou')
+        self.assertIs(ecs._client, alibabacloud.get_resource(
+            'ecs', 'ak', 'secret', 'cn-hangzhou')._client)
+        self.assertIs(ecs._client, get_default_registry().get_client(
+            'ak', 'secret', 'cn-hangzhou'))
+        multi_region_ecs = alibabacloud.get_resource(
+            'ecs', 'ak', 'secret', regions=['cn-hangzhou', 'cn-beijing'])
+        self.assertIs(ecs._client, multi_region_ecs.get_region('cn-hangzhou')._client)
+
+    def test_retry_policy_turns_off_client_retries(self):
+        ecs = alibabacloud.get_resource('ecs', 'ak', 'secret', 'cn-hangzhou',
+                                        retry_policy=RetryPolicy())
+        self.assertFalse(ecs._client._auto_retry)
+        self.assertIsNot(ecs._client, alibabacloud.get_resource(
+            'ecs', 'ak', 'secret', 'cn-hangzhou')._client)
+
+
+if __name__ == '__main__':
+    unittest.main()
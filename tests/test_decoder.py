@@ -0,0 +1,47 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+
+from alibabacloud.resources import decoder
+from tests.fake_ecs import make_instance_data
+
+
+class DecoderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.default_name = decoder.get_default_decoder_name()
+
+    def tearDown(self):
+        decoder.set_default_decoder(self.default_name)
+
+    def test_decoders_agree(self):
+        obj = {'Instances': {'Instance': [make_instance_data(i) for i in range(10)]},
+               'Name': u'中文'}
+        body = json.dumps(obj).encode('utf-8')
+        self.assertIn('json', decoder.available_decoders())
+        for name in decoder.available_decoders():
+            self.assertEqual(obj, decoder.get_decoder(name)(body))
+
+    def test_default_decoder(self):
+        decoder.register_decoder('upper', lambda data: json.loads(data.decode('utf-8').upper()))
+        decoder.set_default_decoder('upper')
+        self.assertEqual({'A': 'B'}, decoder.decode(b'{"a": "b"}'))
+        self.assertEqual('upper', decoder.get_default_decoder_name())
+        self.assertRaises(ValueError, decoder.set_default_decoder, 'no-such-decoder')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import time
+import unittest
+
+from alibabacloud.resources.waiter import BackoffPollStrategy, FixedPollStrategy
+from alibabacloud.services.ecs import ECSInstanceResource, ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+class ECSInstancesTest(unittest.TestCase):
+
+    def _get_ecs_resource(self, fleet_size, **kwargs):
+        self.client = FakeECSClient(fleet_size, **kwargs)
+        return ECSResource(self.client)
+
+    def test_instance_attributes(self):
+        ecs = self._get_ecs_resource(1)
+        instance = list(ecs.instances.all())[0]
+        self.assertFalse(hasattr(instance, '__dict__'))
+        self.assertEqual('ecs.n2.small', instance.instance_type)
+        self.assertEqual(1, instance.cpu)
+        self.assertEqual('coreos', instance.image_id[:6])
+        self.assertIsNone(instance.gpu_amount)
+
+        instance.set_instance_attributes({'NewFeatureFlag': True, 'OSNameEn': 'CoreOS'})
+        self.assertTrue(instance.new_feature_flag)
+        self.assertEqual('CoreOS', instance.os_name_en)
+        self.assertRaises(AttributeError, getattr, instance, 'no_such_attribute')
+
+    def test_attribute_names(self):
+        # the precomputed names are those of the camel case conversion
+        for key, name in ECSInstanceResource.ATTRIBUTE_NAMES.items():
+            s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', key)
+            self.assertEqual(re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower(), name)
+
+    def test_refresh_all(self):
+        ecs = self._get_ecs_resource(250)
+        instances = list(ecs.instances.page_size(100))
+        for instance in instances:
+            instance.status = None
+        self.client.calls = []
+
+        missing = ecs.refresh_all(instances + instances[:5])
+        self.assertEqual([], missing)
+        self.assertEqual(3, len(self.client.calls_of('DescribeInstances')))
+        self.assertTrue(all(i.status == i.STATUS_RUNNING for i in instances))
+
+        instances[0].stop()
+        instances[0].delete()
+        self.assertEqual([instances[0]], ecs.refresh_all(instances))
+
+    def test_wait_until_all(self):
+        ecs = self._get_ecs_resource(0, transition_time=0.5)
+        instances = ecs.run_instances(Amount=150, InstanceType='ecs.n2.small')
+        self.client.calls = []
+
+        results = ecs.wait_until_all(instances, 'Running', timeout=10,
+                                     poll_strategy=FixedPollStrategy(0.6))
+        self.assertEqual(set(i.instance_id for i in instances), set(results))
+        self.assertTrue(all(0 < elapsed < 10 for elapsed in results.values()))
+        self.assertTrue(all(i.status == 'Running' for i in instances))
+        # two cycles of two batched requests each
+        self.assertEqual(4, len(self.client.calls_of('DescribeInstances')))
+
+    def test_wait_until_with_expected_duration(self):
+        ecs = self._get_ecs_resource(1, transition_time=0.3)
+        instance = list(ecs.instances.all())[0]
+        instance.stop()
+        self.client.calls = []
+
+        strategy = BackoffPollStrategy(initial_delay=0.05, jitter=0,
+                                       expected_durations={('Stopping', 'Stopped'): 0.6})
+        instance.wait_until('Stopped', poll_strategy=strategy)
+        self.assertEqual('Stopped', instance.status)
+        self.assertEqual(2, len(self.client.calls_of('DescribeInstances')))
+
+    def test_wait_until_deadline(self):
+        ecs = self._get_ecs_resource(1, transition_time=60)
+        instance = list(ecs.instances.all())[0]
+        instance.stop()
+
+        start = time.time()
+        self.assertRaises(Exception, instance.wait_until, 'Stopped', timeout=0.5,
+                          poll_strategy=FixedPollStrategy(10))
+        self.assertLess(time.time() - start, 1)
+
+    def test_wait_until_all_timeout(self):
+        ecs = self._get_ecs_resource(3)
+        instances = list(ecs.instances.all())
+        results = ecs.wait_until_all(instances, 'Stopped', timeout=0)
+        self.assertEqual(dict((i.instance_id, None) for i in instances), results)
+
+
+if __name__ == '__main__':
+    unittest.main()
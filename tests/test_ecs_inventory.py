@@ -0,0 +1,133 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from alibabacloud.services.ecs import ECSResource
+from alibabacloud.services.ecs_inventory import ECSInventory
+from tests.fake_ecs import FakeECSClient
+
+
+class ECSInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'inventory.db')
+        self.client = FakeECSClient(250)
+        self.ecs = ECSResource(self.client)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_full_sync_and_lookups(self):
+        inventory = ECSInventory(self.path)
+        self.assertIsNone(self.ecs.sync_inventory(inventory))
+        self.assertEqual(250, inventory.count())
+        self.assertEqual(125, inventory.count(instance_type='ecs.n2.small'))
+        self.assertEqual(42, len(inventory.find(zone_id='cn-hangzhou-a')))
+        self.assertEqual('Running', inventory.get('i-{0:020d}'.format(7))['Status'])
+        self.assertIsNone(inventory.get('i-nope'))
+        self.assertRaises(ValueError, inventory.find, color='blue')
+        plan = inventory._conn.execute(
+            'EXPLAIN QUERY PLAN SELECT data FROM instances WHERE instance_id = ?',
+            ('i-nope',)).fetchall()
+        self.assertIn('USING INDEX instances_instance_id', ' '.join(row[-1] for row in plan))
+        inventory.close()
+
+        # the inventory persists
+        inventory = ECSInventory(self.path)
+        self.assertEqual(250, inventory.count(status='Running'))
+
+    def test_incremental_sync(self):
+        inventory = ECSInventory(self.path)
+        self.ecs.sync_inventory(inventory)
+        self.client.calls = []
+
+        self.assertEqual(['Pending', 'Starting', 'Stopping'], inventory.sync(self.ecs))
+        # the new instances, a count per settled status and a scan per
+        # transitional one
+        calls = self.client.calls_of('DescribeInstances')
+        self.assertEqual(1 + 2 + 3, len(calls))
+        self.assertEqual('CreationStartTime', calls[0]['Filter.1.Key'])
+
+        instances = list(self.ecs.instances.limit(3))
+        instances[0].stop()
+        instances[1].stop()
+        instances[1].delete()
+        self.client.add_instance(status='Stopped')
+        self.client.calls = []
+
+        rescanned = inventory.sync(self.ecs)
+        self.assertEqual(['Pending', 'Running', 'Starting', 'Stopping', 'Stopped'], rescanned)
+        self.assertEqual(250, inventory.count())
+        self.assertEqual(2, inventory.count(status='Stopped'))
+        self.assertEqual('Stopped', inventory.get(instances[0].instance_id)['Status'])
+        self.assertIsNone(inventory.get(instances[1].instance_id))
+
+    def test_new_instances_are_fetched_by_creation_time(self):
+        inventory = ECSInventory(self.path)
+        stopped = list(self.ecs.instances.limit(2))
+        for instance in stopped:
+            instance.stop()
+        self.ecs.sync_inventory(inventory)
+
+        # the Stopped count stays the same
+        stopped[0].delete()
+        created = self.ecs.create_instance(InstanceType='ecs.n2.small')
+        self.assertEqual(['Pending', 'Starting', 'Stopping', 'Stopped'],
+                         self.ecs.sync_inventory(inventory))
+        self.assertEqual('Stopped', inventory.get(created.instance_id)['Status'])
+        self.assertIsNone(inventory.get(stopped[0].instance_id))
+        self.assertEqual(250, inventory.count())
+
+        # a swap between settled statuses needs a full sync
+        running = list(self.ecs.instances.filter(Status='Running').limit(1))[0]
+        stopped[1].start()
+        running.stop()
+        self.assertEqual(['Pending', 'Starting', 'Stopping'], self.ecs.sync_inventory(inventory))
+        self.assertEqual('Stopped', inventory.get(stopped[1].instance_id)['Status'])
+        self.assertIsNone(self.ecs.sync_inventory(inventory, full_sync_interval=0))
+        self.assertEqual('Running', inventory.get(stopped[1].instance_id)['Status'])
+
+    def test_regions_are_synced_separately(self):
+        inventory = ECSInventory(self.path)
+        hangzhou_client = FakeECSClient(10)
+        beijing_client = FakeECSClient(5, region_id='cn-beijing')
+        hangzhou = ECSResource(hangzhou_client)
+        beijing = ECSResource(beijing_client)
+        hangzhou.sync_inventory(inventory)
+        beijing.sync_inventory(inventory)
+        self.assertEqual(15, inventory.count())
+        self.assertEqual(10, inventory.count(region_id='cn-hangzhou'))
+        self.assertEqual(5, inventory.count(region_id='cn-beijing'))
+        self.assertIsNotNone(inventory.get_last_full_sync_time('cn-beijing'))
+        self.assertIsNone(inventory.get_last_full_sync_time('us-west-1'))
+
+        # the counts compared are those of the synced region only
+        self.assertEqual(['Pending', 'Starting', 'Stopping'], hangzhou.sync_inventory(inventory))
+        list(beijing.instances.limit(1))[0].stop()
+        self.assertEqual(['Pending', 'Running', 'Starting', 'Stopping', 'Stopped'],
+                         beijing.sync_inventory(inventory))
+        hangzhou.sync_inventory(inventory, full=True)
+        self.assertEqual(15, inventory.count())
+        self.assertEqual(1, inventory.count(region_id='cn-beijing', status='Stopped'))
+        self.assertEqual('Stopped', inventory.get('i-{0:020d}'.format(0), 'cn-beijing')['Status'])
+        self.assertEqual('Running', inventory.get('i-{0:020d}'.format(0), 'cn-hangzhou')['Status'])
+
+
+if __name__ == '__main__':
+    unittest.main()
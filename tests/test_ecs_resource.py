@@ -28,19 +28,16 @@ class EcsResourceTest(SDKTestBase):
 
     def _instance_clean_up(self):
         ecs = self._get_ecs_resource()
-        for inst in ecs.instances.all():
-            if inst.status != inst.STATUS_STOPPED:
-                inst.stop()
-
-        for inst in ecs.instances.all():
-            inst.wait_until(inst.STATUS_STOPPED)
-
-        for inst in ecs.instances.all():
-            inst.delete()
+        report = ecs.instances.filter(status__ne=ECSInstanceResource.STATUS_STOPPED).stop()
+        self.assertEqual([], report.failed)
+        results = ecs.wait_until_all(list(ecs.instances.all()), ECSInstanceResource.STATUS_STOPPED)
+        self.assertNotIn(None, results.values())
+        report = ecs.instances.all().delete()
+        self.assertEqual([], report.failed)
 
         print("waiting all instance to be deleted")
         while True:
-            if len(list(ecs.instances.all())) == 0:
+            if not ecs.instances.exists():
                 break
         print("clean up finished")
 
@@ -115,8 +112,9 @@ class EcsResourceTest(SDKTestBase):
                 instance.start()
                 starting_instances_to_wait.append(instance)
 
-        for instance in starting_instances_to_wait:
-            instance.wait_until(instance.STATUS_RUNNING)
+        results = ecs.wait_until_all(starting_instances_to_wait,
+                                     ECSInstanceResource.STATUS_RUNNING)
+        self.assertNotIn(None, results.values())
 
     def test_instance_resource_collection(self):
         # self._create_a_lot_instances()
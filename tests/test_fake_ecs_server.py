@@ -0,0 +1,61 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+from alibabacloud.resources.waiter import FixedPollStrategy
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs_server import FakeECSServer
+
+
+class FakeECSServerTest(unittest.TestCase):
+
+    def test_pagination(self):
+        with FakeECSServer(fleet_size=250) as server:
+            ecs = ECSResource(server.make_client())
+            instances = list(ecs.instances.page_size(100))
+            self.assertEqual(['i-{0:020d}'.format(i) for i in range(250)],
+                             [i.instance_id for i in instances])
+            self.assertEqual(3, len(server.backend.calls_of('DescribeInstances')))
+            self.assertEqual(63, len(list(ecs.instances.filter(cpu=2))))
+            self.assertEqual(125, len(list(ecs.instances.filter(instance_type='ecs.n2.large'))))
+
+    def test_lifecycle(self):
+        with FakeECSServer(fleet_size=3, transition_time=0.2) as server:
+            ecs = ECSResource(server.make_client())
+            instance = list(ecs.instances.limit(1))[0]
+            instance.stop()
+            instance.refresh()
+            self.assertEqual('Stopping', instance.status)
+            self.assertRaises(ServerException, instance.delete)
+            instance.wait_until('Stopped', timeout=5, poll_strategy=FixedPollStrategy(0.05))
+            instance.delete()
+            self.assertEqual(2, len(list(ecs.instances.all())))
+
+    def test_throttling(self):
+        with FakeECSServer(fleet_size=10, throttle_rate=2) as server:
+            ecs = ECSResource(server.make_client())
+            list(ecs.instances.page_size(5).concurrency(1))
+            try:
+                list(ecs.instances.all())
+                self.fail('a third request within one second should be throttled')
+            except ServerException as e:
+                self.assertEqual('Throttling', e.get_error_code())
+                self.assertEqual(400, e.get_http_status())
+
+
+if __name__ == '__main__':
+    unittest.main()
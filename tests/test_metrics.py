@@ -0,0 +1,94 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+from alibabacloud.resources.metrics import RequestMetrics, RequestObserver
+from alibabacloud.resources.throttling import RetryPolicy
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+class RecordingObserver(RequestObserver):
+
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, request):
+        self.events.append(('before', request.get_action_name()))
+
+    def after_response(self, request, response, latency):
+        self.events.append(('after', request.get_action_name()))
+
+    def on_error(self, request, error, latency, will_retry):
+        self.events.append(('error', error.get_error_code(), will_retry))
+
+
+class RequestObserverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeECSClient(25)
+        self.metrics = RequestMetrics()
+        self.ecs = ECSResource(self.client, observers=[self.metrics],
+                               retry_policy=RetryPolicy(base_delay=0.001))
+
+    def test_hooks(self):
+        observer = RecordingObserver()
+        self.ecs.add_observer(observer)
+        instance = list(self.ecs.instances.limit(1))[0]
+        self.client.fail_next('StopInstance', ServerException('Throttling', 'Throttled.', 400))
+        instance.stop()
+        self.assertEqual([
+            ('before', 'DescribeInstances'),
+            ('after', 'DescribeInstances'),
+            ('before', 'StopInstance'),
+            ('error', 'Throttling', True),
+            ('before', 'StopInstance'),
+            ('after', 'StopInstance'),
+        ], observer.events)
+
+        self.ecs.remove_observer(observer)
+        instance.refresh()
+        self.assertEqual(6, len(observer.events))
+
+    def test_metrics(self):
+        list(self.ecs.instances.page_size(10).concurrency(1))
+        self.client.fail_next('DescribeInstances', ServerException('InvalidParameter', '', 400))
+        self.assertRaises(ServerException, list, self.ecs.instances.all())
+
+        metrics = self.metrics.to_dict()['DescribeInstances']
+        self.assertEqual(4, metrics['count'])
+        self.assertEqual(1, metrics['errors'])
+        self.assertEqual(0, metrics['retries'])
+        self.assertGreater(metrics['response_bytes'], 25 * 500)
+        self.assertEqual((float('inf'), 4), metrics['latency_histogram'][-1])
+        self.assertEqual(len(self.metrics.latency_buckets) + 1, len(metrics['latency_histogram']))
+
+        text = self.metrics.to_prometheus()
+        self.assertIn('# TYPE alibabacloud_requests_total counter\n', text)
+        self.assertIn('alibabacloud_requests_total{action="DescribeInstances"} 4\n', text)
+        self.assertIn('alibabacloud_request_errors_total{action="DescribeInstances"} 1\n', text)
+        self.assertIn('alibabacloud_request_duration_seconds_bucket{action="DescribeInstances",'
+                      'le="+Inf"} 4\n', text)
+        self.assertIn('alibabacloud_request_duration_seconds_count'
+                      '{action="DescribeInstances"} 4\n', text)
+
+        self.metrics.reset()
+        self.assertEqual({}, self.metrics.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+from alibabacloud.services.ecs import MultiRegionECSResource
+from tests.fake_ecs import FakeECSClient
+
+REGION_IDS = ['cn-hangzhou', 'cn-beijing', 'us-west-1']
+
+
+class MultiRegionECSResourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clients = dict((region_id, FakeECSClient(20, region_id=region_id, latency=0.05))
+                            for region_id in REGION_IDS)
+        self.ecs = MultiRegionECSResource([self.clients[r] for r in REGION_IDS])
+
+    def test_regions_are_scanned_concurrently(self):
+        start = time.time()
+        instances = list(self.ecs.instances.page_size(10).concurrency(1))
+        elapsed = time.time() - start
+        self.assertEqual(60, len(instances))
+        # two pages per region, one after the other
+        self.assertLess(elapsed, 0.05 * 2 * 2)
+        for region_id in REGION_IDS:
+            region_instances = [i for i in instances if i.region_id == region_id]
+            self.assertEqual(['i-{0:020d}'.format(i) for i in range(20)],
+                             [i.instance_id for i in region_instances])
+            self.assertEqual(2, len(self.clients[region_id].calls_of('DescribeInstances')))
+
+    def test_items_are_tagged_with_their_region(self):
+        items = list(self.ecs.instances.only('status').raw())
+        self.assertEqual(set(REGION_IDS), set(item['RegionId'] for item in items))
+        instances = list(self.ecs.instances.only('status'))
+        self.assertEqual(set(REGION_IDS), set(i.region_id for i in instances))
+
+        columns = self.ecs.instances.filter(cpu=1).to_columns(['RegionId', 'instance_id'])
+        self.assertEqual(15, len(columns['instance_id']))
+        self.assertEqual(5, columns['RegionId'].count('cn-beijing'))
+
+    def test_limit_spans_regions(self):
+        self.assertEqual(25, len(list(self.ecs.instances.page_size(10).limit(25))))
+        self.assertEqual(7, len(list(self.ecs.instances.filter(status='Running').limit(7))))
+        self.assertEqual(60, self.ecs.instances.count())
+        self.assertEqual(25, self.ecs.instances.limit(25).count())
+        self.assertTrue(self.ecs.instances.filter(cpu=4).exists())
+
+    def test_region_errors_are_raised(self):
+        error = ServerException('InternalError', 'The request processing has failed.', 500)
+        self.clients['cn-beijing'].fail_next('DescribeInstances', error)
+        self.assertRaises(ServerException, list, self.ecs.instances.all())
+
+    def test_bulk_actions_go_to_each_region(self):
+        report = self.ecs.instances.filter(cpu=2).stop()
+        self.assertEqual(15, len(report.succeeded))
+        for region_id in REGION_IDS:
+            self.assertEqual(5, len(self.clients[region_id].calls_of('StopInstance')))
+        stopped = list(self.ecs.instances.filter(status='Stopped'))
+        self.assertEqual(15, len(stopped))
+
+        # the fake clients reuse the same instance ids in every region
+        results = self.ecs.wait_until_all(stopped, 'Stopped')
+        self.assertEqual(5, len(results))
+        self.assertEqual([], self.ecs.refresh_all(stopped))
+        self.assertEqual(5, len(list(self.ecs.get_region('us-west-1').instances.filter(
+            status='Stopped'))))
+
+
+if __name__ == '__main__':
+    unittest.main()
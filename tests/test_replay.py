@@ -0,0 +1,79 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from aliyunsdkcore.acs_exception.exceptions import ClientException, ServerException
+
+from alibabacloud.replay import RecordingClient, ReplayClient
+from alibabacloud.resources.waiter import FixedPollStrategy
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+class RecordReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'traffic.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _run_scenario(self, client):
+        ecs = ECSResource(client)
+        instances = list(ecs.instances.page_size(10))
+        instances[0].stop()
+        instances[0].wait_until('Stopped', poll_strategy=FixedPollStrategy(0.05))
+        try:
+            instances[0].stop()
+        except ServerException as e:
+            error_code = e.get_error_code()
+        return [i.instance_id for i in instances], instances[0].status, error_code
+
+    def test_replay(self):
+        with RecordingClient(FakeECSClient(25, transition_time=0.2, latency=0.01),
+                             self.path) as client:
+            recorded = self._run_scenario(client)
+        self.assertEqual('IncorrectInstanceStatus', recorded[2])
+        self.assertEqual('cn-hangzhou', client.get_region_id())
+
+        replay_client = ReplayClient(self.path)
+        self.assertEqual('cn-hangzhou', replay_client.get_region_id())
+        self.assertEqual(recorded, self._run_scenario(replay_client))
+        self.assertEqual(0, replay_client.misses)
+
+        ecs = ECSResource(ReplayClient(client.records))
+        self.assertRaises(ClientException, list, ecs.instances.page_size(50))
+
+    def test_replay_timing(self):
+        client = RecordingClient(FakeECSClient(25, latency=0.05))
+        list(ECSResource(client).instances.page_size(10).concurrency(1))
+
+        start = time.time()
+        list(ECSResource(ReplayClient(client.records)).instances.page_size(10).concurrency(1))
+        self.assertLess(time.time() - start, 0.05)
+
+        start = time.time()
+        list(ECSResource(ReplayClient(client.records, speed=1)).instances.page_size(10)
+             .concurrency(1))
+        self.assertGreaterEqual(time.time() - start, 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
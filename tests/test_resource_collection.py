@@ -0,0 +1,268 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import unittest
+from array import array
+
+from aliyunsdkcore.acs_exception.exceptions import ServerException
+
+from alibabacloud.resources.collection import _INT_TYPECODE, ScanCursor, _Column
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+class ResourceCollectionTest(unittest.TestCase):
+
+    def _get_ecs_resource(self, fleet_size, **kwargs):
+        self.client = FakeECSClient(fleet_size, **kwargs)
+        return ECSResource(self.client)
+
+    def _get_ids(self, instance_iterable):
+        return [i.instance_id for i in instance_iterable]
+
+    def test_pages_are_yielded_in_order(self):
+        ecs = self._get_ecs_resource(95)
+        pages = list(ecs.instances.page_size(10).pages())
+        self.assertEqual([10] * 9 + [5], [len(page) for page in pages])
+        expected = ['i-{0:020d}'.format(i) for i in range(95)]
+        self.assertEqual(expected, self._get_ids(ecs.instances.page_size(10)))
+        self.assertEqual(expected, self._get_ids(ecs.instances.page_size(10).concurrency(1)))
+
+    def test_pages_are_prefetched_concurrently(self):
+        ecs = self._get_ecs_resource(200, latency=0.05)
+        start = time.time()
+        self.assertEqual(200, len(list(ecs.instances.page_size(10).concurrency(20))))
+        elapsed = time.time() - start
+        self.assertEqual(20, len(self.client.calls_of('DescribeInstances')))
+        self.assertLess(elapsed, 0.05 * 10)
+
+    def test_limit_stops_fetching_pages(self):
+        ecs = self._get_ecs_resource(95)
+        self.assertEqual(25, len(list(ecs.instances.page_size(10).limit(25))))
+        self.assertEqual(3, len(self.client.calls_of('DescribeInstances')))
+
+    def test_pages_are_planned_from_the_limit(self):
+        ecs = self._get_ecs_resource(500)
+
+        def page_sizes(collection):
+            self.client.calls = []
+            instances = list(collection)
+            return len(instances), [params['PageSize'] for params in
+                                    self.client.calls_of('DescribeInstances')]
+
+        self.assertEqual((5, [5]), page_sizes(ecs.instances.limit(5)))
+        self.assertEqual((100, [100]), page_sizes(ecs.instances.limit(100)))
+        self.assertEqual((150, [75, 75]), page_sizes(ecs.instances.limit(150)))
+        self.assertEqual((201, [67] * 3), page_sizes(ecs.instances.limit(201)))
+        self.assertEqual((500, [100] * 5), page_sizes(ecs.instances.all()))
+        self.assertEqual((3, [3]), page_sizes(ecs.instances.page_size(50).limit(3)))
+        self.assertEqual((25, [10] * 3), page_sizes(ecs.instances.page_size(10).limit(25)))
+        # client-side filters may need any page
+        self.assertEqual((5, [100]), page_sizes(ecs.instances.filter(cpu=2).limit(5)))
+
+    def test_empty_fleet(self):
+        ecs = self._get_ecs_resource(0)
+        self.assertEqual([], list(ecs.instances.all()))
+        self.assertEqual([[]], list(ecs.instances.pages()))
+
+    def test_only(self):
+        ecs = self._get_ecs_resource(15)
+        instances = list(ecs.instances.only('status', 'ZoneId').page_size(10))
+        self.assertEqual(15, len(instances))
+        for instance in instances:
+            self.assertEqual('Running', instance.status)
+            self.assertTrue(instance.zone_id.startswith('cn-hangzhou-'))
+            self.assertTrue(instance.instance_id.startswith('i-'))
+            self.assertIsNone(instance.instance_type)
+            self.assertIsNone(instance.vpc_attributes)
+
+        instance = list(ecs.instances.only('os_name_en').only('cpu').limit(1))[0]
+        self.assertEqual(1, instance.cpu)
+        self.assertIsNone(instance.status)
+        self.assertRaises(ValueError, ecs.instances.only)
+
+    def test_raw(self):
+        ecs = self._get_ecs_resource(25)
+        items = list(ecs.instances.page_size(10).raw())
+        self.assertEqual(25, len(items))
+        self.assertEqual('i-{0:020d}'.format(24), items[-1]['InstanceId'])
+        self.assertIn('VpcAttributes', items[0])
+
+        pages = list(ecs.instances.page_size(10).limit(15).only('status').pages(raw=True))
+        self.assertEqual([10, 5], [len(page) for page in pages])
+        self.assertEqual({'InstanceId': 'i-{0:020d}'.format(0), 'Status': 'Running'}, pages[0][0])
+
+    def test_to_columns(self):
+        ecs = self._get_ecs_resource(25)
+        ecs.instances.limit(1).stop()
+        columns = ecs.instances.page_size(10).to_columns(
+            ['instance_type', 'Cpu', 'internet_max_bandwidth_out', 'io_optimized', 'gpu_amount'])
+
+        self.assertEqual(array(_INT_TYPECODE, [1 + i % 4 for i in range(25)]), columns['Cpu'])
+        self.assertEqual(sum(range(25)), sum(columns['internet_max_bandwidth_out']))
+        self.assertEqual(13, columns['instance_type'].count('ecs.n2.small'))
+        self.assertIs(columns['instance_type'][0], columns['instance_type'][2])
+        self.assertEqual([True] * 25, columns['io_optimized'])
+        self.assertEqual([None] * 25, columns['gpu_amount'])
+
+        columns = ecs.instances.filter(Status='Stopped').to_columns(['status'])
+        self.assertEqual({'status': ['Stopped']}, columns)
+
+    def test_column_fallbacks(self):
+        column = _Column()
+        for value in (1, 2, 2 ** 70):
+            column.append(value)
+        self.assertEqual([1, 2, 2 ** 70], column.values)
+
+        column = _Column()
+        for value in (u'Running', u''.join([u'Run', u'ning'])):
+            column.append(value)
+        self.assertIs(column.values[0], column.values[1])
+
+    def test_filter_pushdown(self):
+        ecs = self._get_ecs_resource(30)
+        instances = list(ecs.instances.filter(status='Running', instance_type='ecs.n2.small',
+                                              tags={'team': 'team-1'}))
+        self.assertEqual(15, len(instances))
+        params = self.client.calls_of('DescribeInstances')[0]
+        self.assertEqual('Running', params['Status'])
+        self.assertEqual('ecs.n2.small', params['InstanceType'])
+        self.assertEqual('team', params['Tag.1.Key'])
+        self.assertEqual('team-1', params['Tag.1.Value'])
+
+        self.assertRaises(ValueError, ecs.instances.filter, statsu='Running')
+
+    def test_filter_on_extra_fields(self):
+        ecs = self._get_ecs_resource(30)
+        parse_instances_page = ecs._parse_instances_page
+
+        def parse_with_extra_field(response):
+            page = parse_instances_page(response)
+            for item in page[3]:
+                item['RackId'] = 'rack-{0}'.format(int(item['InstanceId'][2:]) % 3)
+            return page
+
+        ecs._parse_instances_page = parse_with_extra_field
+        instances = list(ecs.instances.filter(RackId='rack-1'))
+        self.assertEqual(10, len(instances))
+        self.assertEqual('rack-1', instances[0].rack_id)
+        self.assertRaises(ValueError, ecs.instances.filter, rack_id='rack-1')
+
+    def test_filter_client_side(self):
+        ecs = self._get_ecs_resource(30)
+        instances = list(ecs.instances.page_size(10).filter(cpu__gte=3, Status='Running'))
+        self.assertEqual(14, len(instances))
+        self.assertTrue(all(instance.cpu >= 3 for instance in instances))
+        self.assertNotIn('Cpu', self.client.calls_of('DescribeInstances')[0])
+
+        names = ['instance-3', 'instance-14', 'instance-25']
+        self.assertEqual(names, [i.instance_name for i in ecs.instances.filter(
+            instance_name__in=names)])
+        self.assertEqual(['i-{0:020d}'.format(i) for i in (4, 8, 24, 28)], [
+            i.instance_id for i in ecs.instances.filter(
+                instance_name=lambda name: name.endswith('4') or name.endswith('8'),
+                cpu=1)])
+        self.assertEqual(4, len(list(ecs.instances.filter(
+            vpc_attributes=lambda vpc: vpc['VpcId'] == 'vpc-{0:012d}'.format(2)).limit(4))))
+
+        # the limit applies to the matches, and scanning stops once reached
+        self.client.calls = []
+        instances = list(ecs.instances.page_size(5).concurrency(1).filter(cpu=2).limit(3))
+        self.assertEqual(['i-{0:020d}'.format(i) for i in (1, 5, 9)], self._get_ids(instances))
+        self.assertEqual(2, len(self.client.calls_of('DescribeInstances')))
+
+    def test_client_side_filters_ramp_up_the_prefetch(self):
+        ecs = self._get_ecs_resource(3000)
+        self.assertEqual(40, len(list(ecs.instances.filter(cpu=2).limit(40))))
+        self.assertEqual(2, len(self.client.calls_of('DescribeInstances')))
+
+        # without a limit every page is needed
+        self.assertEqual(750, len(list(ecs.instances.filter(cpu=2))))
+
+    def test_count_and_exists(self):
+        ecs = self._get_ecs_resource(250)
+        self.assertEqual(250, ecs.instances.count())
+        self.assertEqual(125, ecs.instances.filter(instance_type='ecs.n2.small').count())
+        self.assertEqual(7, ecs.instances.limit(7).count())
+        self.assertTrue(ecs.instances.exists())
+        self.assertFalse(ecs.instances.filter(status='Stopped').exists())
+        calls = self.client.calls_of('DescribeInstances')
+        self.assertEqual(5, len(calls))
+        self.assertTrue(all(params['PageSize'] == 1 for params in calls))
+
+        # client-side filters scan the collection
+        self.assertEqual(63, ecs.instances.filter(cpu=2).count())
+        self.assertTrue(ecs.instances.filter(cpu__gt=3).exists())
+        self.assertFalse(ecs.instances.filter(cpu__gt=4).exists())
+
+    def test_resumable_scan(self):
+        ecs = self._get_ecs_resource(95)
+        error = ServerException('InternalError', 'The request processing has failed.', 500)
+        collection = ecs.instances.filter(status='Running').page_size(10).concurrency(1)
+        cursor = ScanCursor()
+        seen = []
+        pages = collection.scan(cursor, raw=True, page_retries=1, retry_delay=0)
+        for i in range(3):
+            seen.extend(item['InstanceId'] for item in next(pages))
+        self.client.fail_next('DescribeInstances', error, times=2)
+        self.assertRaises(ServerException, next, pages)
+        self.assertEqual({'filter_params': {'Status': 'Running'}, 'page_size': 10,
+                          'next_page': 4, 'items_seen': 30, 'done': False}, cursor.to_dict())
+
+        # resume from the saved cursor, with a page failing once on the way
+        cursor = ScanCursor.from_dict(json.loads(json.dumps(cursor.to_dict())))
+        self.client.fail_next('DescribeInstances', error)
+        for page in collection.scan(cursor, page_retries=1, retry_delay=0):
+            seen.extend(instance.instance_id for instance in page)
+        self.assertEqual(['i-{0:020d}'.format(i) for i in range(95)], seen)
+        self.assertTrue(cursor.done)
+        self.assertEqual((11, 95), (cursor.next_page, cursor.items_seen))
+        self.assertEqual([], list(collection.scan(cursor)))
+
+        self.assertRaises(ValueError, next, ecs.instances.scan(cursor))
+        # tuples come back from JSON as lists
+        instance_ids = tuple('i-{0:020d}'.format(i) for i in range(3))
+        collection = ecs.instances.filter(instance_ids=instance_ids).page_size(2)
+        cursor = ScanCursor()
+        self.assertEqual(2, len(next(collection.scan(cursor))))
+        cursor = ScanCursor.from_dict(json.loads(json.dumps(cursor.to_dict())))
+        self.assertEqual([1], [len(page) for page in collection.scan(cursor)])
+
+        cursor = ScanCursor()
+        self.assertEqual(8, sum(len(page) for page in ecs.instances.limit(8).scan(cursor)))
+        self.assertEqual((2, 8, True), (cursor.next_page, cursor.items_seen, cursor.done))
+
+    def test_bulk_actions(self):
+        ecs = self._get_ecs_resource(30)
+        ecs.instances.limit(5).stop()
+        report = ecs.instances.filter(Status='Running').page_size(10).stop()
+        self.assertEqual('stop', report.action_name)
+        self.assertEqual(25, len(report))
+        self.assertEqual(25, len(report.succeeded))
+        self.assertEqual([], report.failed)
+        self.assertTrue(all(latency >= 0 for latency in report.latencies))
+
+        ecs.instances.limit(3).start()
+        report = ecs.instances.all().delete(max_workers=4)
+        self.assertEqual(27, len(report.succeeded))
+        self.assertEqual(3, len(report.failed))
+        for instance, error in report.failed:
+            self.assertEqual('IncorrectInstanceStatus', error.get_error_code())
+        self.assertEqual(3, len(list(ecs.instances.all())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+import unittest
+
+from aliyunsdkcore.acs_exception.exceptions import ClientException
+
+import alibabacloud
+from alibabacloud.services import available_services, get_service_class, register_service
+from alibabacloud.services.ecs import ECSResource
+
+
+class ServiceRegistryTest(unittest.TestCase):
+
+    def test_services_are_imported_on_first_use(self):
+        script = ("import sys, alibabacloud; "
+                  "print(any(name.startswith(('alibabacloud.services.ecs', 'aliyunsdkecs', "
+                  "'aliyunsdkcore.client')) for name in sys.modules))")
+        output = subprocess.check_output([sys.executable, '-c', script])
+        self.assertEqual(b'False', output.strip())
+
+    def test_get_service_class(self):
+        self.assertIn('ecs', available_services())
+        self.assertIs(ECSResource, get_service_class('ECS'))
+        self.assertIsNone(get_service_class('rds'))
+
+        register_service('ecs-copy', 'alibabacloud.services.ecs:ECSResource')
+        self.addCleanup(alibabacloud.services._services.pop, 'ecs-copy')
+        self.assertIs(ECSResource, get_service_class('ecs-copy'))
+        self.assertIsNone(get_service_class('ecs-copy', 'multi_region'))
+        self.assertRaises(ClientException, alibabacloud.get_resource, 'ecs-copy',
+                          regions=['cn-hangzhou'])
+        self.assertRaises(ClientException, alibabacloud.get_resource, 'rds')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+from itertools import islice
+
+from aliyunsdkcore.acs_exception.exceptions import ClientException, ServerException
+
+from alibabacloud.resources.throttling import RateLimiter, RetryPolicy, TokenBucket
+from alibabacloud.services.ecs import ECSResource
+from tests.fake_ecs import FakeECSClient
+
+
+THROTTLING = ServerException('Throttling', 'Request was denied due to request throttling.', 400)
+INTERNAL_ERROR = ServerException('InternalError', 'The request processing has failed.', 500)
+
+
+class ThrottlingTest(unittest.TestCase):
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=5)
+        start = time.time()
+        for i in range(15):
+            bucket.acquire()
+        # 5 tokens at once, then 10 more at 50 per second
+        self.assertGreaterEqual(time.time() - start, 0.18)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(action_rates={'DescribeInstances': 20})
+        start = time.time()
+        for i in range(100):
+            limiter.acquire('StopInstance')
+        self.assertLess(time.time() - start, 0.1)
+        for i in range(25):
+            limiter.acquire('DescribeInstances')
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_retry_policy(self):
+        policy = RetryPolicy(max_retries=2, base_delay=1, max_delay=5)
+        describe = type('Request', (), {'get_action_name': lambda self: 'DescribeInstances'})()
+        stop = type('Request', (), {'get_action_name': lambda self: 'StopInstance'})()
+        http_error = ClientException('SDK.HttpError', 'Read timed out.')
+
+        self.assertTrue(policy.should_retry(stop, THROTTLING, 0))
+        self.assertFalse(policy.should_retry(stop, THROTTLING, 2))
+        self.assertTrue(policy.should_retry(describe, INTERNAL_ERROR, 0))
+        self.assertTrue(policy.should_retry(describe, http_error, 1))
+        self.assertFalse(policy.should_retry(stop, INTERNAL_ERROR, 0))
+        self.assertFalse(policy.should_retry(stop, http_error, 0))
+        self.assertFalse(policy.should_retry(describe, ValueError(), 0))
+        for delay in islice(policy.delays(), 100):
+            self.assertTrue(1 <= delay <= 5)
+
+    def test_throttled_requests_are_retried(self):
+        client = FakeECSClient(3)
+        ecs = ECSResource(client, retry_policy=RetryPolicy(max_retries=3, base_delay=0.01),
+                          rate_limiter=RateLimiter(rate=1000))
+        client.fail_next('DescribeInstances', THROTTLING, times=3)
+        self.assertEqual(3, len(list(ecs.instances.all())))
+        self.assertEqual(4, len(client.calls_of('DescribeInstances')))
+
+        instance = list(ecs.instances.all())[0]
+        client.fail_next('StopInstance', INTERNAL_ERROR)
+        self.assertRaises(ServerException, instance.stop)
+
+        client.fail_next('DescribeInstances', THROTTLING, times=4)
+        self.assertRaises(ServerException, instance.refresh)
+
+
+if __name__ == '__main__':
+    unittest.main()
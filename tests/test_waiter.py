@@ -0,0 +1,43 @@
+# Copyright 2018 Alibaba Cloud Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from itertools import islice
+
+from alibabacloud.resources.waiter import BackoffPollStrategy, FixedPollStrategy
+
+
+class PollStrategyTest(unittest.TestCase):
+
+    def test_fixed(self):
+        self.assertEqual([2, 2, 2], list(islice(FixedPollStrategy(2).delays(None, 'Running'), 3)))
+
+    def test_backoff(self):
+        strategy = BackoffPollStrategy(initial_delay=1, max_delay=5, jitter=0)
+        self.assertEqual([1, 2, 4, 5, 5], list(islice(strategy.delays('Starting', 'Running'), 5)))
+
+    def test_backoff_jitter(self):
+        strategy = BackoffPollStrategy(initial_delay=4, max_delay=4, jitter=0.5)
+        for delay in islice(strategy.delays(None, 'Running'), 100):
+            self.assertTrue(2 <= delay <= 4)
+
+    def test_backoff_expected_duration(self):
+        strategy = BackoffPollStrategy(initial_delay=1, jitter=0,
+                                       expected_durations={('Stopping', 'Stopped'): 10})
+        self.assertEqual([5, 1, 2], list(islice(strategy.delays('Stopping', 'Stopped'), 3)))
+        self.assertEqual([1, 2, 4], list(islice(strategy.delays('Starting', 'Running'), 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()